@@ -24,6 +24,12 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 ================================================================================
 """
 
+import logging
+
+# Los módulos registran su progreso con logging; sin configuración explícita
+# de la aplicación no se emite nada (NullHandler)
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 # Importar excepciones
 from app.exceptions import (
     PlacasDataError,
@@ -38,6 +44,8 @@ from app.exceptions import (
 # Importar funciones de I/O
 from app.io import (
     read_csv,
+    read_csv_typed,
+    read_csv_chunks,
     save_csv,
     load_or_create_sample_data
 )
@@ -101,6 +109,8 @@ __all__ = [
     
     # I/O
     'read_csv',
+    'read_csv_typed',
+    'read_csv_chunks',
     'save_csv',
     'load_or_create_sample_data',
     
@@ -137,4 +147,3 @@ __all__ = [
     'run_full_pipeline'
 ]
 
-print(f"📦 Paquete 'app' cargado - v{__version__}")
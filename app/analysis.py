@@ -20,12 +20,24 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 ================================================================================
 """
 
+import logging
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
 from app.exceptions import TransformError
+from app.cleaning import STRING_DTYPE
+
+log = logging.getLogger(__name__)
+
+
+# Nombres de los días en el orden de DatetimeIndex.dayofweek (0 = lunes)
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Posibles códigos de provincia (primera letra de la placa)
+LETRAS_PROVINCIA = list('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
 
 
 # ============================================================================
@@ -48,15 +60,20 @@ def get_dataset_summary(df: pd.DataFrame) -> Dict:
     Returns:
         Dict: Diccionario con el resumen del dataset
     """
+    # Cada conteo recorre el DataFrame completo: calcularlo una sola vez
+    nulls = df.isna().sum()
+    uniques = df.nunique()
+    mem_bytes = df.memory_usage(deep=True).sum()
+    
     summary = {
         'filas': len(df),
-        'columnas': len(df.columns),
-        'columnas_lista': list(df.columns),
+        'columnas': df.shape[1],
+        'columnas_lista': df.columns.tolist(),
         'tipos_datos': df.dtypes.to_dict(),
-        'valores_nulos': df.isna().sum().to_dict(),
-        'total_nulos': df.isna().sum().sum(),
-        'valores_unicos': df.nunique().to_dict(),
-        'memoria_uso_mb': df.memory_usage(deep=True).sum() / (1024 * 1024)
+        'valores_nulos': nulls.to_dict(),
+        'total_nulos': int(nulls.sum()),
+        'valores_unicos': uniques.to_dict(),
+        'memoria_uso_mb': mem_bytes / (1024 * 1024)
     }
     
     return summary
@@ -68,7 +85,7 @@ def analyze_estados_ant(df: pd.DataFrame) -> pd.DataFrame:
     
     JUSTIFICACIÓN DE PANDAS:
     - value_counts(): Conteo eficiente de frecuencias
-    - Operaciones vectorizadas para cálculo de porcentajes
+    - Porcentajes calculados aritméticamente sobre los mismos conteos
     - reset_index(): Conversión a DataFrame estructurado
     
     Args:
@@ -86,20 +103,24 @@ def analyze_estados_ant(df: pd.DataFrame) -> pd.DataFrame:
         1  Suspendida        55        5.50
         2   Bloqueada        43        4.30
     """
-    print("📊 Analizando distribución de estados ANT...")
+    log.info("Analizando distribución de estados ANT")
     
     # Usar value_counts() de Pandas - muy eficiente para conteos
     counts = df['estado_ANT'].value_counts()
-    percentages = df['estado_ANT'].value_counts(normalize=True) * 100
+    # Con columnas categóricas value_counts incluye categorías sin registros
+    counts = counts[counts > 0]
+    # Porcentajes derivados de los mismos conteos (sin un segundo
+    # value_counts(normalize=True) sobre toda la columna)
+    total = counts.sum()
     
     # Crear DataFrame de análisis
     analysis = pd.DataFrame({
         'estado_ANT': counts.index,
         'cantidad': counts.values,
-        'porcentaje': percentages.values.round(2)
+        'porcentaje': (counts.values * (100.0 / total)).round(2)
     })
     
-    print(f"✅ Análisis completado: {len(analysis)} estados encontrados")
+    log.info("Análisis completado: %d estados encontrados", len(analysis))
     
     return analysis
 
@@ -119,10 +140,11 @@ def analyze_trafico_por_ubicacion(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Análisis de tráfico por ubicación
     """
-    print("📊 Analizando tráfico por ubicación...")
+    log.info("Analizando tráfico por ubicación")
     
     # Usar groupby de Pandas para agregación eficiente
-    trafico = df.groupby(['ubicacion_camara', 'peaje_ciudad']).agg(
+    # observed=True: solo combinaciones presentes (columnas categóricas)
+    trafico = df.groupby(['ubicacion_camara', 'peaje_ciudad'], observed=True).agg(
         registros=('id', 'count'),
         placas_unicas=('placa', 'nunique'),
         primera_fecha=('fecha_registro', 'min'),
@@ -132,7 +154,7 @@ def analyze_trafico_por_ubicacion(df: pd.DataFrame) -> pd.DataFrame:
     # Ordenar por número de registros (descendente)
     trafico = trafico.sort_values('registros', ascending=False)
     
-    print(f"✅ Análisis completado: {len(trafico)} combinaciones ubicación-peaje")
+    log.info("Análisis completado: %d combinaciones ubicación-peaje", len(trafico))
     
     return trafico
 
@@ -142,10 +164,13 @@ def analyze_temporal(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
     Realiza análisis temporal del dataset.
     
     JUSTIFICACIÓN DE PANDAS:
-    - dt accessor: Extracción eficiente de componentes de fecha
-    - groupby + size(): Conteo rápido por grupos
+    - DatetimeIndex: Extracción eficiente de componentes de fecha
+    - np.bincount: Conteo en una sola pasada sobre dominios pequeños y
+      acotados (años, 12 meses, 24 horas, 7 días), sin hashing ni ordenamiento
     - Soporte nativo para series temporales
     
+    Asume que se aplicó convert_types (fecha_registro ya es datetime64).
+    
     Args:
         df (pd.DataFrame): DataFrame con columna 'fecha_registro'
         
@@ -156,37 +181,51 @@ def analyze_temporal(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         - 'por_hora': Registros por hora del día
         - 'por_dia_semana': Registros por día de la semana
     """
-    print("📊 Realizando análisis temporal...")
+    log.info("Realizando análisis temporal")
     
-    # Asegurar que fecha_registro es datetime
+    # convert_types garantiza el tipo datetime; se verifica siempre (un
+    # assert desaparece con python -O)
     if not pd.api.types.is_datetime64_any_dtype(df['fecha_registro']):
-        df = df.copy()
-        df['fecha_registro'] = pd.to_datetime(df['fecha_registro'])
+        raise TransformError(
+            "fecha_registro debe ser datetime: aplicar convert_types primero",
+            transform_type="temporal_analysis",
+            column="fecha_registro"
+        )
     
-    # Análisis por año
-    por_año = df.groupby(df['fecha_registro'].dt.year).size().reset_index()
-    por_año.columns = ['año', 'registros']
+    # Fechas válidas (los NaT no se cuentan en ningún grupo)
+    fechas = pd.DatetimeIndex(df['fecha_registro'])
+    fechas = fechas[~fechas.isna()]
+    
+    # Análisis por año (rango continuo entre el primer y el último año)
+    años = fechas.year.to_numpy()
+    año_min = años.min() if len(años) else 0
+    conteo_años = np.bincount(años - año_min)
+    por_año = pd.DataFrame({
+        'año': np.arange(año_min, año_min + len(conteo_años)),
+        'registros': conteo_años
+    })
     
     # Análisis por mes (1-12)
-    por_mes = df.groupby(df['fecha_registro'].dt.month).size().reset_index()
-    por_mes.columns = ['mes', 'registros']
+    por_mes = pd.DataFrame({
+        'mes': np.arange(1, 13),
+        'registros': np.bincount(fechas.month, minlength=13)[1:]
+    })
     
     # Análisis por hora del día (0-23)
-    por_hora = df.groupby(df['fecha_registro'].dt.hour).size().reset_index()
-    por_hora.columns = ['hora', 'registros']
-    
-    # Análisis por día de la semana
-    por_dia_semana = df.groupby(df['fecha_registro'].dt.day_name()).size().reset_index()
-    por_dia_semana.columns = ['dia_semana', 'registros']
+    por_hora = pd.DataFrame({
+        'hora': np.arange(24),
+        'registros': np.bincount(fechas.hour, minlength=24)
+    })
     
-    # Ordenar días de la semana correctamente
-    dias_orden = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    por_dia_semana['dia_orden'] = por_dia_semana['dia_semana'].map(
-        {day: i for i, day in enumerate(dias_orden)}
-    )
-    por_dia_semana = por_dia_semana.sort_values('dia_orden').drop('dia_orden', axis=1)
+    # Análisis por día de la semana: los códigos 0-6 ya siguen el orden
+    # lunes-domingo, por lo que no hace falta ordenar. La columna es una
+    # categórica ordenada: sort_values('dia_semana') respeta la semana
+    por_dia_semana = pd.DataFrame({
+        'dia_semana': pd.Categorical(DIAS_SEMANA, categories=DIAS_SEMANA, ordered=True),
+        'registros': np.bincount(fechas.dayofweek, minlength=7)
+    })
     
-    print(f"✅ Análisis temporal completado")
+    log.info("Análisis temporal completado")
     
     return {
         'por_año': por_año,
@@ -201,9 +240,9 @@ def analyze_frecuencia_placas(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
     Analiza la frecuencia de aparición de cada placa.
     
     JUSTIFICACIÓN DE PANDAS:
-    - value_counts(): Conteo ultra-eficiente de frecuencias
-    - describe(): Estadísticas descriptivas automáticas
-    - Indexación booleana para filtrado
+    - factorize(): Codifica cada placa como un entero en una sola pasada
+    - np.bincount(): Conteo de frecuencias sobre los códigos enteros
+    - Estadísticas calculadas sobre el arreglo de conteos (una fila por placa)
     
     Args:
         df (pd.DataFrame): DataFrame con columna 'placa'
@@ -213,24 +252,34 @@ def analyze_frecuencia_placas(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
         - DataFrame con frecuencia por placa
         - Diccionario con estadísticas de frecuencia
     """
-    print("📊 Analizando frecuencia de placas...")
-    
-    # Contar frecuencia de cada placa
-    frecuencia = df['placa'].value_counts().reset_index()
-    frecuencia.columns = ['placa', 'num_registros']
-    
-    # Calcular estadísticas
+    log.info("Analizando frecuencia de placas")
+    
+    # Codificar las placas como enteros una sola vez (-1 = nulo) y contar
+    # las frecuencias sobre los códigos, sin volver a hashear strings
+    codes, uniques = pd.factorize(df['placa'].values, sort=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    
+    frecuencia = pd.DataFrame({'placa': uniques, 'num_registros': counts})
+    frecuencia = frecuencia.sort_values(
+        'num_registros', ascending=False, kind='stable'
+    ).reset_index(drop=True)
+    
+    # Calcular estadísticas directamente sobre el arreglo de conteos; sin
+    # placas (DataFrame o bloque vacío) las estadísticas son NaN, como en
+    # las reducciones de pandas
+    placas_con_un_registro = np.count_nonzero(counts == 1)
+    hay_placas = counts.size > 0
     stats = {
-        'total_placas_unicas': len(frecuencia),
-        'promedio_registros': frecuencia['num_registros'].mean(),
-        'mediana_registros': frecuencia['num_registros'].median(),
-        'max_registros': frecuencia['num_registros'].max(),
-        'min_registros': frecuencia['num_registros'].min(),
-        'placas_con_un_registro': (frecuencia['num_registros'] == 1).sum(),
-        'placas_con_multiples': (frecuencia['num_registros'] > 1).sum()
+        'total_placas_unicas': len(uniques),
+        'promedio_registros': counts.mean() if hay_placas else np.nan,
+        'mediana_registros': np.median(counts) if hay_placas else np.nan,
+        'max_registros': counts.max() if hay_placas else np.nan,
+        'min_registros': counts.min() if hay_placas else np.nan,
+        'placas_con_un_registro': placas_con_un_registro,
+        'placas_con_multiples': len(uniques) - placas_con_un_registro
     }
     
-    print(f"✅ Análisis completado: {stats['total_placas_unicas']} placas únicas")
+    log.info("Análisis completado: %d placas únicas", stats['total_placas_unicas'])
     
     return frecuencia, stats
 
@@ -251,38 +300,53 @@ def identify_alertas(df: pd.DataFrame) -> Dict:
         Dict con información de alertas:
         - 'total_alertas': Número total de registros con alerta
         - 'por_estado': Conteo por tipo de alerta
-        - 'placas_alertas': Lista de placas con alertas
+        - 'placas_con_alertas': Número de placas únicas con alertas
+        - 'lista_placas': pd.Index con las placas con alertas
+          (usar list(...) si se requiere una lista)
         - 'detalle': DataFrame con detalle de alertas
     """
-    print("🚨 Identificando vehículos con alertas...")
+    log.info("Identificando vehículos con alertas")
     
     # Filtrar estados problemáticos
     alertas_df = df[df['estado_ANT'].isin(['Bloqueada', 'Suspendida'])].copy()
     
     # Conteo por estado
-    por_estado = alertas_df['estado_ANT'].value_counts().to_dict()
-    
-    # Placas únicas con alertas
-    placas_con_alertas = alertas_df['placa'].unique().tolist()
-    
-    # Detalle de alertas por placa
-    detalle = alertas_df.groupby(['placa', 'estado_ANT']).agg(
+    por_estado = alertas_df['estado_ANT'].value_counts()
+    por_estado = por_estado[por_estado > 0].to_dict()
+    
+    # Placas únicas con alertas: un pd.Index en lugar de una lista de
+    # Python (sin copiar cada string; la pertenencia 'in' usa su tabla hash)
+    placas_con_alertas = pd.Index(alertas_df['placa'].unique(), name='placa')
+    
+    # Detalle de alertas por placa: las agregaciones count/min/max usan la
+    # ruta optimizada (Cython) de groupby; una lambda dentro de .agg() la
+    # obligaría a iterar grupo por grupo en Python
+    grupos = alertas_df.groupby(['placa', 'estado_ANT'], observed=True)
+    detalle = grupos.agg(
         num_detecciones=('id', 'count'),
         primera_deteccion=('fecha_registro', 'min'),
-        ultima_deteccion=('fecha_registro', 'max'),
-        ubicaciones=('ubicacion_camara', lambda x: ', '.join(x.unique()))
-    ).reset_index().sort_values('num_detecciones', ascending=False)
+        ultima_deteccion=('fecha_registro', 'max')
+    )
+    
+    # Ubicaciones únicas por grupo, en orden de aparición (unique() es
+    # vectorizado); solo el join final de cada arreglo pequeño se hace en
+    # Python
+    ubicaciones = grupos['ubicacion_camara'].unique().map(
+        lambda arr: ', '.join(arr[~pd.isna(arr)])
+    )
+    detalle = detalle.join(ubicaciones.rename('ubicaciones'))
+    detalle = detalle.reset_index().sort_values('num_detecciones', ascending=False)
     
     result = {
         'total_alertas': len(alertas_df),
         'por_estado': por_estado,
-        'placas_con_alertas': len(placas_con_alertas),
+        'placas_con_alertas': placas_con_alertas.size,
         'lista_placas': placas_con_alertas,
         'detalle': detalle
     }
     
-    print(f"✅ Alertas identificadas: {result['total_alertas']} registros, "
-          f"{result['placas_con_alertas']} placas únicas")
+    log.info("Alertas identificadas: %d registros, %d placas únicas",
+             result['total_alertas'], result['placas_con_alertas'])
     
     return result
 
@@ -293,56 +357,82 @@ def create_features(df: pd.DataFrame) -> pd.DataFrame:
     
     JUSTIFICACIÓN DE PANDAS:
     - Operaciones vectorizadas para creación de columnas
-    - dt accessor para extracción de componentes temporales
+    - DatetimeIndex para extraer todos los componentes temporales de una vez
     - str accessor para manipulación de strings
     
     Nuevas variables creadas:
     - año, mes, dia, hora: Componentes de fecha
-    - dia_semana: Nombre del día
+    - dia_semana: Nombre del día (categórica ordenada lunes-domingo)
     - es_fin_semana: Indicador booleano
-    - placa_provincia: Código de provincia (primera letra)
+    - placa_provincia: Código de provincia (primera letra, categórica)
     - placa_sin_guion: Placa normalizada para ordenamiento
     
+    Asume que se aplicó convert_types (fecha_registro ya es datetime64).
+    
     Args:
         df (pd.DataFrame): DataFrame original
         
     Returns:
         pd.DataFrame: DataFrame con nuevas variables
     """
-    print("🔧 Creando nuevas variables (feature engineering)...")
-    
-    df_copy = df.copy()
+    log.info("Creando nuevas variables (feature engineering)")
     
     try:
-        # Asegurar que fecha_registro es datetime
-        if not pd.api.types.is_datetime64_any_dtype(df_copy['fecha_registro']):
-            df_copy['fecha_registro'] = pd.to_datetime(df_copy['fecha_registro'])
-        
-        # Variables temporales usando el accessor .dt de Pandas
-        df_copy['año'] = df_copy['fecha_registro'].dt.year
-        df_copy['mes'] = df_copy['fecha_registro'].dt.month
-        df_copy['dia'] = df_copy['fecha_registro'].dt.day
-        df_copy['hora'] = df_copy['fecha_registro'].dt.hour
-        df_copy['dia_semana'] = df_copy['fecha_registro'].dt.day_name()
+        # convert_types garantiza el tipo datetime; se verifica siempre (un
+        # assert desaparece con python -O)
+        fecha = df['fecha_registro']
+        if not pd.api.types.is_datetime64_any_dtype(fecha):
+            raise TransformError(
+                "fecha_registro debe ser datetime: aplicar convert_types primero",
+                transform_type="feature_engineering",
+                column="fecha_registro"
+            )
         
-        # Indicador de fin de semana
-        df_copy['es_fin_semana'] = df_copy['fecha_registro'].dt.dayofweek >= 5
+        # Variables temporales desde un único DatetimeIndex: cada componente
+        # se extrae directamente del buffer datetime64, sin un accessor .dt
+        # (y una Serie intermedia) por variable
+        fechas = pd.DatetimeIndex(fecha)
         
-        # Extraer código de provincia de la placa (primera letra)
-        # En Ecuador, la primera letra indica la provincia
-        df_copy['placa_provincia'] = df_copy['placa'].str[0]
+        # Día de la semana como código 0-6 (-1 para fechas nulas); el nombre
+        # se obtiene de las categorías, sin crear un string por fila
+        dia_codigo = np.where(fechas.isna(), -1, fechas.dayofweek).astype(np.int8)
         
-        # Placa normalizada (sin guión, mayúsculas) para ordenamiento
-        df_copy['placa_sin_guion'] = df_copy['placa'].str.replace('-', '').str.upper()
+        # Convertir la placa una sola vez a cadenas tipadas: los métodos .str
+        # se ejecutan en C sobre el buffer en lugar de elemento por elemento
+        placa_arr = df['placa'].astype(STRING_DTYPE)
         
-        # Indicador de alerta
-        df_copy['tiene_alerta'] = df_copy['estado_ANT'].isin(['Bloqueada', 'Suspendida'])
+        # Crear todas las variables con un único assign: con copy-on-write el
+        # nuevo DataFrame comparte las columnas originales y solo reserva
+        # memoria para las columnas nuevas (sin df.copy() previo)
+        df_copy = df.assign(**{
+            'año': fechas.year,
+            'mes': fechas.month,
+            'dia': fechas.day,
+            'hora': fechas.hour,
+            'dia_semana': pd.Categorical.from_codes(
+                dia_codigo, categories=DIAS_SEMANA, ordered=True),
+            # Indicador de fin de semana
+            'es_fin_semana': dia_codigo >= 5,
+            # Código de provincia (en Ecuador, la primera letra de la placa),
+            # categórico con las letras fijas: se almacena como códigos int8
+            'placa_provincia': pd.Categorical(placa_arr.str.slice(0, 1),
+                                              categories=LETRAS_PROVINCIA),
+            # Placa normalizada (sin guión, en mayúsculas) para ordenamiento:
+            # reemplazo literal de un carácter (pc.replace_substring con
+            # pyarrow, sin motor de regex). Se mantiene upper(): la función
+            # también puede recibir placas que no pasaron por convert_types
+            'placa_sin_guion': placa_arr.str.replace('-', '', regex=False).str.upper(),
+            # Indicador de alerta (isin sobre códigos si la columna es categórica)
+            'tiene_alerta': df['estado_ANT'].isin(['Bloqueada', 'Suspendida']),
+        })
         
-        print(f"✅ Variables creadas: año, mes, dia, hora, dia_semana, es_fin_semana, "
-              f"placa_provincia, placa_sin_guion, tiene_alerta")
+        log.info("Variables creadas: año, mes, dia, hora, dia_semana, es_fin_semana, "
+                 "placa_provincia, placa_sin_guion, tiene_alerta")
         
         return df_copy
         
+    except TransformError:
+        raise
     except Exception as e:
         raise TransformError(
             "Error al crear nuevas variables",
@@ -377,6 +467,9 @@ def generate_statistics_table(df: pd.DataFrame) -> pd.DataFrame:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    pd.options.mode.copy_on_write = True
+    
     # Pruebas del módulo
     print("=" * 60)
     print("PRUEBAS DEL MÓDULO DE ANÁLISIS")
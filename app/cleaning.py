@@ -17,12 +17,18 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 ================================================================================
 """
 
+import logging
+import re
+
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from pandas.api.types import union_categoricals
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from app.exceptions import SchemaError, TransformError
 
+log = logging.getLogger(__name__)
+
 
 # ============================================================================
 # COLUMNAS REQUERIDAS PARA EL DATASET DE PLACAS VEHICULARES
@@ -31,6 +37,11 @@ from app.exceptions import SchemaError, TransformError
 REQUIRED_COLUMNS = ['id', 'placa', 'fecha_registro', 'estado_ANT', 
                     'ubicacion_camara', 'peaje_ciudad']
 
+# Formato de placa ecuatoriana (3 letras, guión, 4 dígitos) compilado una
+# sola vez, para validar placas individuales con fullmatch. Las columnas
+# completas se validan con _plate_format_mask, sin regex.
+PLATE_RE = re.compile(r'[A-Z]{3}-[0-9]{4}')
+
 COLUMN_TYPES = {
     'id': 'numeric',
     'placa': 'string',
@@ -40,6 +51,24 @@ COLUMN_TYPES = {
     'peaje_ciudad': 'string'
 }
 
+# Tipo de dato para columnas de texto: cadenas respaldadas por Apache Arrow
+# si pyarrow está instalado (kernels en C sobre buffers contiguos) o el
+# StringDtype nativo de pandas en caso contrario.
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Tipos aplicados directamente durante el parseo del CSV (ver
+# app.io.read_csv_typed): convert_types solo valida y limpia después
+COLUMN_DTYPES = {
+    'placa': STRING_DTYPE,
+    'estado_ANT': 'category',
+    'ubicacion_camara': 'category',
+    'peaje_ciudad': 'category'
+}
+
 
 # ============================================================================
 # ETAPA 3: VALIDACIÓN DE ESQUEMA Y TIPOS
@@ -70,36 +99,52 @@ def validate_schema(df: pd.DataFrame, required_columns: List[str] = None) -> boo
     if required_columns is None:
         required_columns = REQUIRED_COLUMNS
     
-    print("🔍 Validando esquema del dataset...")
+    log.info("Validando esquema del dataset")
     
-    # Obtener columnas presentes en el DataFrame
-    present_columns = set(df.columns)
-    required_set = set(required_columns)
-    
-    # Encontrar columnas faltantes
-    missing_columns = required_set - present_columns
+    # Encontrar columnas faltantes (pd.Index.difference usa la tabla hash
+    # interna del índice, sin construir sets de Python)
+    missing_columns = pd.Index(required_columns).difference(df.columns).tolist()
     
     if missing_columns:
         raise SchemaError(
             "El dataset no contiene todas las columnas requeridas",
-            missing_columns=list(missing_columns)
+            missing_columns=missing_columns
         )
     
-    print(f"✅ Esquema válido: {len(required_columns)} columnas verificadas")
-    print(f"   Columnas encontradas: {list(required_columns)}")
+    log.info("Esquema válido: %d columnas verificadas", len(required_columns))
+    log.info("   Columnas encontradas: %s", list(required_columns))
     
     return True
 
 
+def _strip_to_category(serie: pd.Series) -> pd.Series:
+    """
+    Convierte una columna de texto a category eliminando espacios.
+    
+    Si la columna ya es categórica (leída con COLUMN_DTYPES) solo se limpian
+    las categorías, que son pocas, en lugar de todos los valores.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(STRING_DTYPE).str.strip()
+        # Si al limpiar dos categorías coinciden se reconstruye la columna
+        if categorias.is_unique:
+            return serie.cat.rename_categories(categorias)
+    return serie.astype(STRING_DTYPE).str.strip().astype('category')
+
+
 def convert_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     Convierte las columnas a sus tipos de datos correctos.
     
     Realiza conversiones de tipo con manejo de errores:
-    - id: a numérico (int)
-    - placa: a string
-    - fecha_registro: a datetime
-    - estado_ANT, ubicacion_camara, peaje_ciudad: a string
+    - id: a numérico, reducido al entero más pequeño posible (ej. uint16)
+    - placa: a string tipado (STRING_DTYPE), los nulos se mantienen como NA
+    - fecha_registro: a datetime (falla si algún valor no es una fecha válida)
+    - estado_ANT, ubicacion_camara, peaje_ciudad: a category (pocos valores
+      distintos: se almacenan como códigos enteros)
+    
+    Si el DataFrame se leyó con read_csv_typed las columnas ya llegan con
+    su tipo y esta función solo reduce 'id' y elimina espacios.
     
     Args:
         df (pd.DataFrame): DataFrame a convertir
@@ -109,58 +154,87 @@ def convert_types(df: pd.DataFrame) -> pd.DataFrame:
         
     Raises:
         TransformError: Si la conversión de tipos falla de forma irrecuperable
+            o si alguna fecha no se puede interpretar
         
     Example:
         >>> df_converted = convert_types(df)
     """
-    print("🔄 Convirtiendo tipos de datos...")
-    df_copy = df.copy()
+    log.info("Convirtiendo tipos de datos")
     conversion_report = {}
+    # Columnas presentes en un set (búsqueda O(1)); assign no agrega ni
+    # quita columnas, por lo que el set sigue siendo válido en toda la función
+    has = set(df.columns).__contains__
     
     try:
         # Convertir 'id' a numérico
-        if 'id' in df_copy.columns:
-            original_nulls = df_copy['id'].isna().sum()
-            df_copy['id'] = pd.to_numeric(df_copy['id'], errors='coerce')
-            new_nulls = df_copy['id'].isna().sum()
+        if has('id'):
+            original_nulls = df['id'].isna().sum()
+            ids = pd.to_numeric(df['id'], errors='coerce')
+            new_nulls = ids.isna().sum()
+            # Reducir al entero más pequeño que contenga los valores (los ids
+            # sin nulos son positivos: uint16/uint32 en lugar de int64)
+            downcast = 'unsigned' if new_nulls == 0 else 'integer'
+            df = df.assign(id=pd.to_numeric(ids, downcast=downcast))
             conversion_report['id'] = {
                 'tipo': 'numeric',
-                'valores_convertidos_a_nulo': new_nulls - original_nulls
+                'valores_convertidos_a_nulo': new_nulls - original_nulls,
+                'dtype_final': str(df['id'].dtype)
             }
         
-        # Convertir 'placa' a string
-        if 'placa' in df_copy.columns:
-            df_copy['placa'] = df_copy['placa'].astype(str)
+        # Convertir 'placa' a string tipado (una sola conversión; los nulos
+        # se conservan como NA en lugar del texto 'nan' de astype(str))
+        if has('placa'):
+            placa = df['placa'].astype(STRING_DTYPE)
             # Limpiar placas: eliminar espacios y convertir a mayúsculas
-            df_copy['placa'] = df_copy['placa'].str.strip().str.upper()
-            conversion_report['placa'] = {'tipo': 'string', 'limpieza': 'strip+upper'}
+            df = df.assign(placa=placa.str.strip().str.upper())
+            conversion_report['placa'] = {'tipo': STRING_DTYPE, 'limpieza': 'strip+upper'}
         
-        # Convertir 'fecha_registro' a datetime
-        if 'fecha_registro' in df_copy.columns:
-            original_nulls = df_copy['fecha_registro'].isna().sum()
-            df_copy['fecha_registro'] = pd.to_datetime(
-                df_copy['fecha_registro'], 
+        # Convertir 'fecha_registro' a datetime (estricto: los análisis
+        # posteriores asumen datetime64 y no vuelven a convertir)
+        if has('fecha_registro'):
+            original_nulls = df['fecha_registro'].isna().sum()
+            # Resolución uniforme en ns (el lector pyarrow produce segundos)
+            df = df.assign(fecha_registro=pd.to_datetime(
+                df['fecha_registro'], 
                 errors='coerce'
-            )
-            new_nulls = df_copy['fecha_registro'].isna().sum()
+            ).astype('datetime64[ns]'))
+            new_nulls = df['fecha_registro'].isna().sum()
+            if new_nulls > original_nulls:
+                raise TransformError(
+                    f"{new_nulls - original_nulls} fechas no se pudieron convertir a datetime",
+                    transform_type="type_conversion",
+                    column="fecha_registro"
+                )
             conversion_report['fecha_registro'] = {
                 'tipo': 'datetime',
                 'valores_convertidos_a_nulo': new_nulls - original_nulls
             }
         
-        # Convertir columnas de texto
+        # Convertir columnas de texto a categóricas: son de baja cardinalidad,
+        # por lo que value_counts/groupby/isin operan sobre códigos enteros
         text_columns = ['estado_ANT', 'ubicacion_camara', 'peaje_ciudad']
-        for col in text_columns:
-            if col in df_copy.columns:
-                df_copy[col] = df_copy[col].astype(str).str.strip()
-                conversion_report[col] = {'tipo': 'string', 'limpieza': 'strip'}
+        present = [col for col in text_columns if has(col)]
+        # Las columnas que aún no son categóricas se convierten juntas a
+        # STRING_DTYPE con un solo astype; luego las tres se limpian y se
+        # asignan en un único assign
+        pendientes = [col for col in present
+                      if not isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if pendientes:
+            df = df.assign(**dict(df[pendientes].astype(STRING_DTYPE).items()))
+        df = df.assign(**{col: _strip_to_category(df[col]) for col in present})
+        for col in present:
+            conversion_report[col] = {'tipo': 'category', 'limpieza': 'strip'}
         
-        print("✅ Conversión de tipos completada")
+        log.info("Conversión de tipos completada")
         for col, info in conversion_report.items():
-            print(f"   • {col}: {info}")
+            log.info("   • %s: %s", col, info)
         
-        return df_copy
+        # assign devuelve un DataFrame nuevo en cada paso y el original no se
+        # modifica; con copy-on-write comparte las columnas no convertidas
+        return df
         
+    except TransformError:
+        raise
     except Exception as e:
         raise TransformError(
             "Error durante la conversión de tipos",
@@ -173,37 +247,214 @@ def convert_types(df: pd.DataFrame) -> pd.DataFrame:
 # ETAPA 4: LIMPIEZA BÁSICA
 # ============================================================================
 
-def remove_duplicates(df: pd.DataFrame, subset: List[str] = None) -> Tuple[pd.DataFrame, int]:
+def _as_chunks(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterable[pd.DataFrame]:
+    """
+    Normaliza la entrada de las funciones de limpieza a un iterable de bloques.
+    """
+    return [df] if isinstance(df, pd.DataFrame) else df
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena bloques limpios conservando las columnas categóricas.
+    
+    pd.concat convierte a object una columna categórica si las categorías
+    difieren entre bloques; por eso antes se unen las categorías de cada
+    columna y todos los bloques se recodifican a ese tipo común.
+    """
+    if len(chunks) == 0:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    tipos = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categorias = union_categoricals([chunk[col] for chunk in chunks]).categories
+            tipos[col] = pd.CategoricalDtype(categorias)
+    if tipos:
+        chunks = [chunk.astype(tipos) for chunk in chunks]
+    return pd.concat(chunks)
+
+
+def _drop_duplicates(df: pd.DataFrame, subset: Optional[List[str]]) -> pd.DataFrame:
+    """
+    Elimina duplicados de un DataFrame conservando la primera aparición.
+    """
+    if subset is not None:
+        columnas = set(df.columns)
+        missing_columns = [col for col in subset if col not in columnas]
+        if missing_columns:
+            raise SchemaError(
+                "Las columnas de subset no existen en el dataset",
+                missing_columns=missing_columns
+            )
+    if subset is not None and len(subset) == 1:
+        # Una sola columna (ej. 'placa'): duplicated() sobre esa Serie usa
+        # una tabla hash de un solo arreglo, sin el hashing multicolumna de
+        # drop_duplicates; se filtra una única vez con la máscara
+        keep_mask = ~df[subset[0]].duplicated(keep='first').to_numpy()
+        return df[keep_mask]
+    return df.drop_duplicates(subset=subset, keep='first')
+
+
+def remove_duplicates(df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                      subset: List[str] = None) -> Tuple[pd.DataFrame, int]:
     """
     Elimina filas duplicadas del DataFrame.
     
+    Acepta también un iterable de bloques: cada bloque se deduplica por
+    separado (se conserva la primera aparición) y una pasada final sobre los
+    bloques ya reducidos elimina los duplicados entre bloques.
+    
     Args:
-        df (pd.DataFrame): DataFrame a limpiar
+        df (pd.DataFrame | Iterable[pd.DataFrame]): DataFrame o bloques a limpiar
         subset (List[str]): Columnas a considerar para detectar duplicados
-                           (default: todas las columnas)
+                           (default: todas las columnas). Con una sola
+                           columna se usa Series.duplicated directamente
     
     Returns:
         Tuple[pd.DataFrame, int]: DataFrame sin duplicados y número de duplicados eliminados
         
+    Raises:
+        SchemaError: Si alguna columna de subset no existe
+        
     Example:
         >>> df_clean, n_removed = remove_duplicates(df)
         >>> print(f"Se eliminaron {n_removed} duplicados")
     """
-    print("🧹 Eliminando duplicados...")
-    
-    rows_before = len(df)
-    df_clean = df.drop_duplicates(subset=subset, keep='first')
+    log.info("Eliminando duplicados")
+    
+    if isinstance(subset, str):
+        subset = [subset]
+    
+    if isinstance(df, pd.DataFrame):
+        rows_before = len(df)
+        df_clean = _drop_duplicates(df, subset)
+    else:
+        rows_before = 0
+        reducidos = []
+        for chunk in df:
+            rows_before += len(chunk)
+            reducidos.append(_drop_duplicates(chunk, subset))
+        df_clean = _drop_duplicates(_concat_chunks(reducidos), subset)
     rows_after = len(df_clean)
     
     duplicates_removed = rows_before - rows_after
     
-    print(f"✅ Duplicados eliminados: {duplicates_removed}")
-    print(f"   Filas antes: {rows_before}, Filas después: {rows_after}")
+    log.info("Duplicados eliminados: %d", duplicates_removed)
+    log.info("   Filas antes: %d, Filas después: %d", rows_before, rows_after)
     
     return df_clean, duplicates_removed
 
 
-def handle_missing_values(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+def _impute_text(serie: pd.Series, faltantes: pd.Series) -> pd.Series:
+    """
+    Reemplaza por 'DESCONOCIDO' las posiciones marcadas en faltantes.
+    
+    En columnas categóricas la imputación se hace con NumPy sobre los
+    códigos enteros (np.where), sin comparar strings fila por fila: se
+    descarta la categoría 'nan', se agrega 'DESCONOCIDO' y las posiciones
+    faltantes reciben su código.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = [c for c in serie.cat.categories if c != 'nan']
+        if 'DESCONOCIDO' not in categorias:
+            categorias.append('DESCONOCIDO')
+        serie = serie.cat.set_categories(
+            pd.Index(categorias, dtype=serie.cat.categories.dtype))
+        codigos = np.where(faltantes.to_numpy(),
+                           categorias.index('DESCONOCIDO'),
+                           serie.cat.codes.to_numpy())
+        return pd.Series(
+            pd.Categorical.from_codes(codigos, dtype=serie.dtype),
+            index=serie.index, name=serie.name
+        )
+    return serie.mask(faltantes, 'DESCONOCIDO')
+
+
+def _handle_missing_chunk(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Aplica las reglas de handle_missing_values a un DataFrame (o bloque).
+    
+    Retorna el DataFrame limpio y los conteos numéricos de cada regla, para
+    que handle_missing_values pueda sumarlos entre bloques.
+    """
+    # Sin copia previa: el filtrado y assign devuelven DataFrames nuevos,
+    # por lo que el DataFrame recibido no se modifica
+    df_copy = df
+    conteos = {'removed': {}, 'imputed': {}}
+    # Columnas presentes en un set (búsqueda O(1)); el filtrado y assign no
+    # cambian las columnas, por lo que se calcula una sola vez
+    has = set(df_copy.columns).__contains__
+    
+    # Máscara de nulos calculada una sola vez: de ella salen el reporte
+    # inicial y los conteos/máscaras de cada regla
+    na_mask = df_copy.isna()
+    conteos['nulls_before'] = na_mask.sum().to_dict()
+    
+    # Reglas 1 y 2: eliminar filas sin id o sin placa válida (nula, vacía o
+    # el texto 'nan') con una sola máscara y un único filtrado
+    keep = np.ones(len(df_copy), dtype=bool)
+    
+    if has('id'):
+        id_ok = ~na_mask['id'].to_numpy()
+        conteos['removed']['id'] = int((~id_ok).sum())
+        keep &= id_ok
+    
+    if has('placa'):
+        placa = df_copy['placa']
+        placa_ok = ~(na_mask['placa'] | placa.isin(['', 'nan'])).to_numpy()
+        # Solo se cuentan las filas que no se eliminaron ya por falta de id
+        conteos['removed']['placa'] = int((keep & ~placa_ok).sum())
+        keep &= placa_ok
+    
+    if not keep.all():
+        df_copy = df_copy[keep]
+        na_mask = na_mask[keep]
+    
+    # Regla 3: Imputar fecha_registro con fecha actual
+    if has('fecha_registro'):
+        nulls = int(na_mask['fecha_registro'].sum())
+        if nulls > 0:
+            df_copy = df_copy.assign(
+                fecha_registro=df_copy['fecha_registro'].fillna(pd.Timestamp.now()))
+            conteos['imputed']['fecha_registro'] = nulls
+    
+    # Regla 4: Imputar columnas de texto con "DESCONOCIDO"
+    text_columns = ['estado_ANT', 'ubicacion_camara', 'peaje_ciudad']
+    cols_present = [col for col in text_columns if has(col)]
+    if cols_present:
+        texto = df_copy[cols_present]
+        # Faltantes (nulos o el texto 'nan') de todas las columnas en una sola
+        # operación sobre el bloque, antes de modificar ninguna columna
+        faltantes = na_mask[cols_present] | texto.eq('nan')
+        nulls_map = faltantes.sum().to_dict()
+        pendientes = [col for col in cols_present if nulls_map[col] > 0]
+        df_copy = df_copy.assign(**{
+            col: _impute_text(texto[col], faltantes[col]) for col in pendientes
+        })
+        for col in pendientes:
+            conteos['imputed'][col] = int(nulls_map[col])
+    
+    # Dejar las columnas de texto como category y la placa como string
+    # tipado también cuando no se aplicó convert_types (sin costo si ya
+    # tienen ese tipo)
+    tipos = {col: 'category' for col in cols_present
+             if not isinstance(df_copy[col].dtype, pd.CategoricalDtype)}
+    if has('placa') and not isinstance(df_copy['placa'].dtype, pd.StringDtype):
+        tipos['placa'] = STRING_DTYPE
+    if tipos:
+        df_copy = df_copy.astype(tipos)
+    
+    # Valores nulos después (única segunda pasada)
+    conteos['nulls_after'] = df_copy.isna().sum().to_dict()
+    
+    return df_copy, conteos
+
+
+def handle_missing_values(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+                          ) -> Tuple[pd.DataFrame, Dict]:
     """
     Maneja valores faltantes según reglas específicas para cada columna.
     
@@ -215,122 +466,166 @@ def handle_missing_values(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
     - ubicacion_camara: imputar con "DESCONOCIDO"
     - peaje_ciudad: imputar con "DESCONOCIDO"
     
+    Al terminar, las columnas de texto quedan como category y la placa
+    como STRING_DTYPE.
+    
+    También acepta un iterable de bloques (ej. app.io.read_csv_chunks): cada
+    bloque se limpia por separado, los bloques se concatenan al final y el
+    reporte suma los conteos de todos.
+    
     Args:
-        df (pd.DataFrame): DataFrame a limpiar
+        df (pd.DataFrame | Iterable[pd.DataFrame]): DataFrame o bloques a limpiar
         
     Returns:
-        Tuple[pd.DataFrame, Dict]: DataFrame limpio y reporte de imputaciones
+        Tuple[pd.DataFrame, Dict]: DataFrame limpio (nuevo; el original no
+        se modifica) y reporte de imputaciones
         
     Example:
         >>> df_clean, report = handle_missing_values(df)
     """
-    print("🔧 Manejando valores faltantes...")
-    df_copy = df.copy()
-    
-    # Reporte de valores nulos antes
-    nulls_before = df_copy.isna().sum().to_dict()
-    total_nulls_before = sum(nulls_before.values())
-    
+    log.info("Manejando valores faltantes")
+    
+    limpios = []
+    nulls_before, nulls_after = {}, {}
+    removed, imputed = {}, {}
+    for chunk in _as_chunks(df):
+        chunk_limpio, conteos = _handle_missing_chunk(chunk)
+        limpios.append(chunk_limpio)
+        for total, parcial in ((nulls_before, conteos['nulls_before']),
+                               (nulls_after, conteos['nulls_after']),
+                               (removed, conteos['removed']),
+                               (imputed, conteos['imputed'])):
+            for col, n in parcial.items():
+                total[col] = total.get(col, 0) + int(n)
+    
+    df_copy = _concat_chunks(limpios)
+    
+    # Reporte de imputaciones
     imputation_report = {
         'nulls_before': nulls_before,
         'actions': {},
-        'rows_removed': 0
+        'rows_removed': sum(removed.values())
     }
+    if 'id' in removed:
+        imputation_report['actions']['id'] = f"Eliminadas {removed['id']} filas sin id"
+    if 'placa' in removed:
+        imputation_report['actions']['placa'] = f"Eliminadas {removed['placa']} filas sin placa válida"
+    for col, nulls in imputed.items():
+        if col == 'fecha_registro':
+            imputation_report['actions'][col] = f"Imputados {nulls} valores con fecha actual"
+        else:
+            imputation_report['actions'][col] = f"Imputados {nulls} valores con 'DESCONOCIDO'"
+    imputation_report['nulls_after'] = nulls_after
     
-    # Regla 1: Eliminar filas sin id
-    if 'id' in df_copy.columns:
-        rows_before = len(df_copy)
-        df_copy = df_copy.dropna(subset=['id'])
-        rows_removed = rows_before - len(df_copy)
-        imputation_report['actions']['id'] = f"Eliminadas {rows_removed} filas sin id"
-        imputation_report['rows_removed'] += rows_removed
-    
-    # Regla 2: Eliminar filas sin placa
-    if 'placa' in df_copy.columns:
-        rows_before = len(df_copy)
-        df_copy = df_copy.dropna(subset=['placa'])
-        # También eliminar placas vacías o inválidas
-        df_copy = df_copy[df_copy['placa'].str.len() > 0]
-        df_copy = df_copy[df_copy['placa'] != 'nan']
-        rows_removed = rows_before - len(df_copy)
-        imputation_report['actions']['placa'] = f"Eliminadas {rows_removed} filas sin placa válida"
-        imputation_report['rows_removed'] += rows_removed
-    
-    # Regla 3: Imputar fecha_registro con fecha actual
-    if 'fecha_registro' in df_copy.columns:
-        nulls = df_copy['fecha_registro'].isna().sum()
-        if nulls > 0:
-            df_copy['fecha_registro'] = df_copy['fecha_registro'].fillna(pd.Timestamp.now())
-            imputation_report['actions']['fecha_registro'] = f"Imputados {nulls} valores con fecha actual"
-    
-    # Regla 4: Imputar columnas de texto con "DESCONOCIDO"
-    text_columns = ['estado_ANT', 'ubicacion_camara', 'peaje_ciudad']
-    for col in text_columns:
-        if col in df_copy.columns:
-            nulls = df_copy[col].isna().sum()
-            # También considerar 'nan' como string nulo
-            df_copy[col] = df_copy[col].replace('nan', np.nan)
-            nulls += (df_copy[col] == 'nan').sum()
-            if nulls > 0:
-                df_copy[col] = df_copy[col].fillna('DESCONOCIDO')
-                imputation_report['actions'][col] = f"Imputados {nulls} valores con 'DESCONOCIDO'"
-    
-    # Reporte de valores nulos después
-    nulls_after = df_copy.isna().sum().to_dict()
+    total_nulls_before = sum(nulls_before.values())
     total_nulls_after = sum(nulls_after.values())
-    imputation_report['nulls_after'] = nulls_after
     
-    print(f"✅ Valores faltantes manejados")
-    print(f"   Nulos antes: {total_nulls_before}, Nulos después: {total_nulls_after}")
-    print(f"   Filas eliminadas: {imputation_report['rows_removed']}")
+    log.info("Valores faltantes manejados")
+    log.info("   Nulos antes: %d, Nulos después: %d", total_nulls_before, total_nulls_after)
+    log.info("   Filas eliminadas: %d", imputation_report['rows_removed'])
     
     for col, action in imputation_report['actions'].items():
-        print(f"   • {col}: {action}")
+        log.info("   • %s: %s", col, action)
     
     return df_copy, imputation_report
 
 
-def validate_plate_format(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+def _plate_structure_mask(placas: Union[pd.Series, pd.Index]) -> np.ndarray:
+    """
+    Máscara booleana de placas con formato ABC-1234 (3 letras, guión, 4 dígitos).
+    
+    El formato es fijo, así que en lugar de aplicar una regex por fila se
+    comprueba la estructura con NumPy: las placas de 8 caracteres se
+    convierten a un arreglo (n, 8) de bytes (o de códigos Unicode si hay
+    caracteres no ASCII) y se comparan rangos por columna. Las placas nulas
+    o de otra longitud son inválidas.
+    """
+    longitudes = placas.str.len().fillna(0).to_numpy(dtype=np.int64)
+    mask = longitudes == 8
+    if mask.any():
+        valores = placas[mask].to_numpy()
+        try:
+            # Placas ASCII (el caso normal): un solo buffer de bytes uint8,
+            # 1 byte por carácter en lugar de los 4 de un arreglo Unicode
+            chars = np.frombuffer(''.join(valores).encode('ascii'), dtype=np.uint8)
+            chars = chars.reshape(-1, 8)
+        except UnicodeEncodeError:
+            chars = valores.astype('U8').view(np.uint32).reshape(-1, 8)
+        letras = ((chars[:, :3] >= ord('A')) & (chars[:, :3] <= ord('Z'))).all(axis=1)
+        guion = chars[:, 3] == ord('-')
+        digitos = ((chars[:, 4:] >= ord('0')) & (chars[:, 4:] <= ord('9'))).all(axis=1)
+        mask[mask] = letras & guion & digitos
+    return mask
+
+
+def _plate_format_mask(placas: pd.Series) -> np.ndarray:
+    """
+    Máscara de formato válido por fila, calculada sobre las placas únicas.
+    
+    Cada placa aparece en muchas lecturas de cámara: pd.factorize obtiene
+    los valores distintos y el código de cada fila, la estructura se
+    comprueba solo sobre los distintos y el resultado vuelve a las filas
+    indexando por código (las placas nulas tienen código -1 → inválidas).
+    """
+    codigos, unicas = pd.factorize(placas)
+    # Se agrega un False al final para que el código -1 (nulo) lo seleccione
+    validas = np.append(_plate_structure_mask(unicas), False)
+    return validas[codigos]
+
+
+def validate_plate_format(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+                          ) -> Tuple[pd.DataFrame, int]:
     """
     Valida que las placas tengan el formato ecuatoriano correcto (ABC-1234).
     
+    Acepta también un iterable de bloques: se filtra cada bloque y se
+    concatenan solo las filas válidas.
+    
     Args:
-        df (pd.DataFrame): DataFrame con columna 'placa'
+        df (pd.DataFrame | Iterable[pd.DataFrame]): DataFrame o bloques con
+            columna 'placa'
         
     Returns:
-        Tuple[pd.DataFrame, int]: DataFrame con placas válidas y número de inválidas
+        Tuple[pd.DataFrame, int]: DataFrame nuevo con placas válidas (el
+        original no se modifica) y número de inválidas
         
     Example:
         >>> df_valid, invalid_count = validate_plate_format(df)
     """
-    import re
-    
-    print("🔍 Validando formato de placas...")
-    
-    # Patrón para placa ecuatoriana: 3 letras, guión, 4 números
-    pattern = r'^[A-Z]{3}-[0-9]{4}$'
-    
-    # Verificar formato
-    df_copy = df.copy()
-    valid_mask = df_copy['placa'].str.match(pattern, na=False)
-    
-    invalid_count = (~valid_mask).sum()
+    log.info("Validando formato de placas")
+    
+    validos = []
+    invalid_count = 0
+    invalid_plates = []
+    for chunk in _as_chunks(df):
+        # Verificar formato (patrón ^[A-Z]{3}-[0-9]{4}$ sin motor de regex)
+        valid_mask = _plate_format_mask(chunk['placa'])
+        invalidas = int((~valid_mask).sum())
+        invalid_count += invalidas
+        
+        # Guardar algunas placas inválidas como ejemplo (solo si se registra)
+        if invalidas and len(invalid_plates) < 5 and log.isEnabledFor(logging.WARNING):
+            invalid_plates += chunk.loc[~valid_mask, 'placa'].head(5 - len(invalid_plates)).tolist()
+        
+        # Filtrar solo placas válidas (la selección booleana ya es un
+        # DataFrame nuevo: no hace falta .copy())
+        validos.append(chunk[valid_mask])
     
     if invalid_count > 0:
-        print(f"⚠️ Encontradas {invalid_count} placas con formato inválido")
-        # Mostrar algunas placas inválidas como ejemplo
-        invalid_plates = df_copy[~valid_mask]['placa'].head(5).tolist()
-        print(f"   Ejemplos de placas inválidas: {invalid_plates}")
+        log.warning("Encontradas %d placas con formato inválido", invalid_count)
+        log.warning("   Ejemplos de placas inválidas: %s", invalid_plates)
     
-    # Filtrar solo placas válidas
-    df_valid = df_copy[valid_mask].copy()
+    df_valid = _concat_chunks(validos)
     
-    print(f"✅ Validación completada: {len(df_valid)} placas válidas")
+    log.info("Validación completada: %d placas válidas", len(df_valid))
     
     return df_valid, invalid_count
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    pd.options.mode.copy_on_write = True
+    
     # Pruebas del módulo
     print("=" * 60)
     print("PRUEBAS DEL MÓDULO DE LIMPIEZA")
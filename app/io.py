@@ -14,14 +14,77 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 ================================================================================
 """
 
-import pandas as pd
+import logging
 import os
-from typing import Optional
+import stat
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, Optional, Union
 
 from app.exceptions import DataReadError, SaveError
+from app.cleaning import COLUMN_DTYPES, convert_types
+
+log = logging.getLogger(__name__)
+
+# Placa sintética en formato estructurado (SoA): las 3 letras como bytes
+# ASCII y los 4 dígitos como entero; el texto 'ABC-1234' solo se construye
+# al crear el DataFrame final
+PLATE_DTYPE = np.dtype([('L', 'S3'), ('D', np.uint16)])
+
+# Motor de parseo para read_csv/read_csv_typed: el lector multihilo de Apache Arrow
+# si pyarrow está instalado, o el lector en C de pandas en caso contrario.
+# pyarrow también habilita la copia en Parquet de los datos de ejemplo y el
+# escritor CSV de Arrow en save_csv.
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    CSV_ENGINE = 'pyarrow'
+    PARQUET_AVAILABLE = True
+except ImportError:
+    CSV_ENGINE = 'c'
+    PARQUET_AVAILABLE = False
 
 
-def read_csv(filepath: str, encoding: str = 'utf-8') -> pd.DataFrame:
+def _check_csv_path(filepath: str) -> None:
+    """
+    Verifica que la ruta exista, sea un archivo y tenga extensión .csv.
+    
+    Raises:
+        DataReadError: Si alguna de las verificaciones falla
+    """
+    # Verificar que el archivo existe (un solo stat() responde existencia y
+    # tipo de archivo)
+    try:
+        info = os.stat(filepath)
+    except FileNotFoundError:
+        raise DataReadError(
+            f"El archivo no existe: {filepath}",
+            filepath=filepath
+        )
+    except OSError as e:
+        raise DataReadError(
+            f"No se puede acceder al archivo: {filepath}",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    # Verificar que es un archivo (no un directorio)
+    if not stat.S_ISREG(info.st_mode):
+        raise DataReadError(
+            f"La ruta no corresponde a un archivo: {filepath}",
+            filepath=filepath
+        )
+    
+    # Verificar extensión
+    if not filepath.lower().endswith('.csv'):
+        raise DataReadError(
+            f"El archivo no tiene extensión .csv: {filepath}",
+            filepath=filepath
+        )
+
+
+def read_csv(filepath: str, encoding: str = 'utf-8', **read_options) -> pd.DataFrame:
     """
     Lee un archivo CSV y retorna un DataFrame de pandas.
     
@@ -32,6 +95,9 @@ def read_csv(filepath: str, encoding: str = 'utf-8') -> pd.DataFrame:
     Args:
         filepath (str): Ruta al archivo CSV a leer
         encoding (str): Codificación del archivo (default: 'utf-8')
+        **read_options: Opciones adicionales para pd.read_csv
+                        (ej. dtype, parse_dates, engine). Por defecto se
+                        usa CSV_ENGINE ('pyarrow' si está instalado)
         
     Returns:
         pd.DataFrame: DataFrame con los datos del archivo
@@ -48,30 +114,13 @@ def read_csv(filepath: str, encoding: str = 'utf-8') -> pd.DataFrame:
     df = None
     
     try:
-        # Verificar que el archivo existe
-        if not os.path.exists(filepath):
-            raise DataReadError(
-                f"El archivo no existe: {filepath}",
-                filepath=filepath
-            )
-        
-        # Verificar que es un archivo (no un directorio)
-        if not os.path.isfile(filepath):
-            raise DataReadError(
-                f"La ruta no corresponde a un archivo: {filepath}",
-                filepath=filepath
-            )
-        
-        # Verificar extensión
-        if not filepath.lower().endswith('.csv'):
-            raise DataReadError(
-                f"El archivo no tiene extensión .csv: {filepath}",
-                filepath=filepath
-            )
+        _check_csv_path(filepath)
         
-        # Intentar leer el archivo
-        print(f"📂 Leyendo archivo: {filepath}")
-        df = pd.read_csv(filepath, encoding=encoding)
+        # Intentar leer el archivo (con el lector de Arrow si está disponible,
+        # salvo que se indique otro motor)
+        log.info("Leyendo archivo: %s", filepath)
+        read_options.setdefault('engine', CSV_ENGINE)
+        df = pd.read_csv(filepath, encoding=encoding, **read_options)
         
         # Verificar que el DataFrame no está vacío
         if df.empty:
@@ -80,7 +129,7 @@ def read_csv(filepath: str, encoding: str = 'utf-8') -> pd.DataFrame:
                 filepath=filepath
             )
         
-        print(f"✅ Archivo leído exitosamente: {len(df)} filas, {len(df.columns)} columnas")
+        log.info("Archivo leído exitosamente: %d filas, %d columnas", len(df), df.shape[1])
         
     except DataReadError:
         # Re-lanzar excepciones propias sin modificar
@@ -125,11 +174,169 @@ def read_csv(filepath: str, encoding: str = 'utf-8') -> pd.DataFrame:
         # Bloque finally: siempre se ejecuta, útil para liberar recursos
         if file_handle is not None:
             file_handle.close()
-        print("📋 Operación de lectura finalizada")
+        log.debug("Operación de lectura finalizada")
     
     return df
 
 
+def read_csv_typed(filepath: str, encoding: str = 'utf-8',
+                   chunksize: Optional[int] = None
+                   ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Lee un CSV de placas aplicando los tipos de datos durante el parseo.
+    
+    En lugar de leer todo como texto y convertir en una segunda pasada,
+    el lector recibe directamente los tipos (COLUMN_DTYPES) y la columna de
+    fecha a interpretar, por lo que convert_types solo debe reducir 'id' y
+    eliminar espacios.
+    
+    Para archivos grandes, con chunksize se retorna un generador que lee
+    el archivo por bloques y aplica convert_types a cada uno. Las
+    categorías de cada bloque pueden diferir: las agregaciones deben
+    combinarse por bloque (ej. sumando conteos) en lugar de concatenar.
+    
+    Args:
+        filepath (str): Ruta al archivo CSV a leer
+        encoding (str): Codificación del archivo (default: 'utf-8')
+        chunksize (int, optional): Filas por bloque; None lee todo el archivo
+        
+    Returns:
+        pd.DataFrame con los tipos aplicados, o un generador de DataFrames
+        ya convertidos si se indica chunksize
+        
+    Raises:
+        DataReadError: Si el archivo no existe o no se puede parsear
+        
+    Example:
+        >>> df = convert_types(read_csv_typed("data/raw.csv"))
+        >>> bloques = read_csv_typed("data/raw.csv", chunksize=100_000)
+        >>> total_alertas = sum(int(b['estado_ANT'].isin(['Bloqueada']).sum()) for b in bloques)
+    """
+    read_options = {
+        'dtype': COLUMN_DTYPES,
+        'parse_dates': ['fecha_registro'],
+    }
+    
+    if chunksize is None:
+        return read_csv(filepath, encoding, **read_options)
+    
+    return (convert_types(chunk)
+            for chunk in read_csv_chunks(filepath, chunksize, encoding, **read_options))
+
+
+def read_csv_chunks(filepath: str, chunksize: int = 500_000, encoding: str = 'utf-8',
+                    **read_options) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV por bloques de chunksize filas sin cargar el archivo completo.
+    
+    Solo un bloque vive en memoria a la vez. Las funciones de limpieza
+    (validate_plate_format, remove_duplicates, handle_missing_values)
+    aceptan directamente este generador y concatenan al final.
+    
+    La ruta se valida al llamar a la función; el archivo se va leyendo a
+    medida que se consumen los bloques. El motor pyarrow no admite lectura
+    por bloques, por lo que se usa el lector en C.
+    
+    Args:
+        filepath (str): Ruta al archivo CSV a leer
+        chunksize (int): Filas por bloque (default: 500_000)
+        encoding (str): Codificación del archivo (default: 'utf-8')
+        **read_options: Opciones adicionales para pd.read_csv (ej. dtype)
+        
+    Returns:
+        Iterator[pd.DataFrame]: Generador de bloques
+        
+    Raises:
+        DataReadError: Si el archivo no existe o no se puede leer (vacío,
+            formato corrupto, codificación o permisos), con los mismos
+            mensajes que read_csv
+        
+    Example:
+        >>> df_valid, invalidas = validate_plate_format(read_csv_chunks("data/raw.csv"))
+    """
+    _check_csv_path(filepath)
+    return _iter_csv_chunks(filepath, chunksize, encoding, read_options)
+
+
+def _iter_csv_chunks(filepath: str, chunksize: int, encoding: str,
+                     read_options: dict) -> Iterator[pd.DataFrame]:
+    """
+    Genera los bloques de un CSV ya validado por read_csv_chunks.
+    """
+    log.info("Leyendo archivo por bloques de %d filas: %s", chunksize, filepath)
+    
+    try:
+        with pd.read_csv(filepath, encoding=encoding, chunksize=chunksize,
+                         engine='c', **read_options) as reader:
+            yield from reader
+    
+    except DataReadError:
+        # Re-lanzar excepciones propias sin modificar
+        raise
+    
+    except pd.errors.EmptyDataError as e:
+        raise DataReadError(
+            "El archivo CSV está vacío o tiene formato inválido",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    except pd.errors.ParserError as e:
+        raise DataReadError(
+            "Error al parsear el archivo CSV - formato corrupto",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    except UnicodeDecodeError as e:
+        raise DataReadError(
+            f"Error de codificación al leer el archivo (prueba con encoding='latin-1')",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    except PermissionError as e:
+        raise DataReadError(
+            "No hay permisos para leer el archivo",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    except Exception as e:
+        raise DataReadError(
+            f"Error inesperado al leer el archivo: {type(e).__name__}",
+            filepath=filepath,
+            original_error=e
+        )
+    
+    finally:
+        log.debug("Operación de lectura finalizada")
+
+
+def _write_csv_arrow(df: pd.DataFrame, filepath: str, index: bool,
+                     encoding: str) -> Optional[int]:
+    """
+    Escribe el CSV con pyarrow.csv y retorna los bytes escritos.
+    
+    Retorna None (sin crear el archivo) si pyarrow no está disponible, si se
+    pide el índice o una codificación distinta de UTF-8, o si alguna
+    columna no se puede convertir a Arrow; en ese caso se usa df.to_csv.
+    """
+    if not PARQUET_AVAILABLE or index or encoding.lower().replace('-', '') != 'utf8':
+        return None
+    
+    try:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        log.debug("Arrow no puede convertir el DataFrame (%s), se usa to_csv", e)
+        return None
+    
+    # El contador de posición del archivo entrega el tamaño sin otro stat()
+    with pa.OSFile(filepath, 'wb') as destino:
+        pa_csv.write_csv(tabla, destino)
+        return destino.tell()
+
+
 def save_csv(df: pd.DataFrame, filepath: str, index: bool = False, 
              encoding: str = 'utf-8') -> bool:
     """
@@ -138,6 +345,12 @@ def save_csv(df: pd.DataFrame, filepath: str, index: bool = False,
     Implementa manejo robusto de errores para garantizar que los datos
     se guarden correctamente o se reporte el error de forma clara.
     
+    Si pyarrow está instalado, el archivo se escribe con el escritor CSV
+    multihilo de Arrow (solo sin índice y en UTF-8, lo único que admite);
+    las columnas que Arrow no puede convertir y los demás casos usan
+    df.to_csv. Arrow escribe los textos entre comillas y las fechas con
+    nanosegundos, formato que read_csv vuelve a leer sin cambios.
+    
     Args:
         df (pd.DataFrame): DataFrame a guardar
         filepath (str): Ruta donde guardar el archivo
@@ -171,22 +384,27 @@ def save_csv(df: pd.DataFrame, filepath: str, index: bool = False,
         # Crear directorio si no existe
         directory = os.path.dirname(filepath)
         if directory and not os.path.exists(directory):
-            print(f"📁 Creando directorio: {directory}")
+            log.info("Creando directorio: %s", directory)
             os.makedirs(directory, exist_ok=True)
         
         # Guardar el archivo
-        print(f"💾 Guardando archivo: {filepath}")
-        df.to_csv(filepath, index=index, encoding=encoding)
-        
-        # Verificar que el archivo se guardó correctamente
-        if not os.path.exists(filepath):
-            raise SaveError(
-                "El archivo no se creó después de guardar",
-                filepath=filepath
-            )
-        
-        file_size = os.path.getsize(filepath)
-        print(f"✅ Archivo guardado exitosamente: {file_size:,} bytes")
+        log.info("Guardando archivo: %s", filepath)
+        file_size = _write_csv_arrow(df, filepath, index, encoding)
+        
+        if file_size is None:
+            df.to_csv(filepath, index=index, encoding=encoding)
+            
+            # Verificar que el archivo se guardó correctamente (el mismo
+            # stat() entrega el tamaño)
+            try:
+                file_size = os.stat(filepath).st_size
+            except FileNotFoundError:
+                raise SaveError(
+                    "El archivo no se creó después de guardar",
+                    filepath=filepath
+                )
+        
+        log.info("Archivo guardado exitosamente: %d bytes", file_size)
         
         return True
         
@@ -216,7 +434,38 @@ def save_csv(df: pd.DataFrame, filepath: str, index: bool = False,
         )
         
     finally:
-        print("📋 Operación de guardado finalizada")
+        log.debug("Operación de guardado finalizada")
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """
+    Retorna os.stat(path), o None si la ruta no existe o no es accesible.
+    """
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _csv_header(filepath: str) -> List[str]:
+    """
+    Retorna los nombres de columna del CSV leyendo solo la cabecera.
+    
+    Retorna una lista vacía si no se puede leer; read_csv reporta luego el
+    error real.
+    """
+    try:
+        return pd.read_csv(filepath, nrows=0).columns.tolist()
+    except (OSError, ValueError):
+        return []
+
+
+def _plates_to_str(placas: np.ndarray) -> np.ndarray:
+    """
+    Materializa las placas de un arreglo PLATE_DTYPE como texto 'ABC-1234'.
+    """
+    digitos = np.char.zfill(placas['D'].astype('U4'), 4)
+    return np.char.add(np.char.add(placas['L'].astype('U3'), '-'), digitos)
 
 
 def load_or_create_sample_data(filepath: str, n_samples: int = 1000) -> pd.DataFrame:
@@ -224,7 +473,14 @@ def load_or_create_sample_data(filepath: str, n_samples: int = 1000) -> pd.DataF
     Carga datos existentes o crea un dataset de ejemplo si no existe.
     
     Esta función es útil para pruebas y desarrollo, permitiendo trabajar
-    incluso cuando no hay datos reales disponibles.
+    incluso cuando no hay datos reales disponibles. Los datos de ejemplo
+    solo se generan si el archivo no existe: un archivo existente que no se
+    puede leer produce DataReadError y nunca se sobrescribe.
+    
+    Si pyarrow está instalado, junto al CSV se guarda una copia en Parquet
+    (mismo nombre, extensión .parquet) que se prefiere al recargar: las
+    columnas ya tienen su tipo y no hay que parsear texto. Si esa copia no
+    se puede leer, se lee el CSV.
     
     Args:
         filepath (str): Ruta al archivo CSV
@@ -232,64 +488,105 @@ def load_or_create_sample_data(filepath: str, n_samples: int = 1000) -> pd.DataF
         
     Returns:
         pd.DataFrame: DataFrame con los datos
+        
+    Raises:
+        DataReadError: Si el archivo existe pero no se puede leer (o solo
+            existe la copia Parquet y no se puede leer)
     """
-    import numpy as np
-    import random
-    import string
+    parquet_path = os.path.splitext(filepath)[0] + '.parquet'
     
-    try:
-        # Intentar cargar datos existentes
-        return read_csv(filepath)
-        
-    except DataReadError:
-        print(f"⚠️ Archivo no encontrado, generando datos de ejemplo...")
-        
-        # Generar datos sintéticos de placas ecuatorianas
-        np.random.seed(42)
-        
-        def generate_plate():
-            """Genera una placa ecuatoriana aleatoria (formato ABC-1234)"""
-            letters = ''.join(random.choices(string.ascii_uppercase, k=3))
-            numbers = ''.join(random.choices(string.digits, k=4))
-            return f"{letters}-{numbers}"
-        
-        # Generar placas únicas
-        placas = list(set([generate_plate() for _ in range(n_samples * 2)]))[:n_samples]
-        
-        # Ciudades y peajes de Ecuador
-        ubicaciones = ['Quito', 'Guayaquil', 'Cuenca', 'Ambato', 'Riobamba', 
-                      'Manta', 'Machala', 'Santo Domingo']
-        peajes = ['Peaje Oyacoto', 'Peaje Yaguachi', 'Peaje Chivería', 
-                 'Peaje San Andrés', 'Peaje Chaquilcay', 'Peaje San Juan',
-                 'Peaje Manta-Rocafuerte', 'Peaje El Garrido', 'Peaje Santo Domingo']
-        estados = ['Habilitada', 'Suspendida', 'Bloqueada']
-        
-        # Crear DataFrame
-        df = pd.DataFrame({
-            'id': range(1, n_samples + 1),
-            'placa': np.random.choice(placas, n_samples),
-            'fecha_registro': pd.date_range(
-                start='2020-01-01', 
-                end='2025-12-31', 
-                periods=n_samples
-            ),
-            'estado_ANT': np.random.choice(
-                estados, 
-                n_samples, 
-                p=[0.90, 0.06, 0.04]  # 90% habilitadas, 6% suspendidas, 4% bloqueadas
-            ),
-            'ubicacion_camara': np.random.choice(ubicaciones, n_samples),
-            'peaje_ciudad': np.random.choice(peajes, n_samples)
-        })
-        
-        # Guardar el archivo generado
-        save_csv(df, filepath)
-        print(f"✅ Dataset de ejemplo generado con {n_samples} registros")
-        
-        return df
+    # Preferir la copia Parquet si existe y no es más antigua que el CSV
+    # (un stat() por archivo para existencia, tipo y fecha de modificación)
+    parquet_info = _stat_or_none(parquet_path) if PARQUET_AVAILABLE else None
+    csv_info = _stat_or_none(filepath) if parquet_info else None
+    if parquet_info and stat.S_ISREG(parquet_info.st_mode) and (
+            csv_info is None or parquet_info.st_mtime >= csv_info.st_mtime):
+        log.info("Leyendo archivo: %s", parquet_path)
+        try:
+            return pd.read_parquet(parquet_path)
+        except Exception as e:
+            # Copia Parquet dañada o ilegible: se recurre al CSV
+            log.warning("No se pudo leer %s (%s)", parquet_path, type(e).__name__)
+            if csv_info is None:
+                # Sin CSV no se generan datos nuevos (se sobrescribiría la
+                # copia Parquet existente)
+                raise DataReadError(
+                    "Error al leer la copia Parquet y no existe el CSV",
+                    filepath=parquet_path,
+                    original_error=e
+                )
+    
+    if csv_info is None:
+        csv_info = _stat_or_none(filepath)
+    if csv_info is not None:
+        # Cargar datos existentes; fecha_registro se interpreta durante el
+        # parseo (llega como datetime64, no como texto) solo si el archivo
+        # tiene esa columna. Cualquier error de lectura se propaga.
+        parse_dates = (['fecha_registro']
+                       if 'fecha_registro' in _csv_header(filepath) else None)
+        return read_csv(filepath, parse_dates=parse_dates)
+    
+    log.warning("Archivo no encontrado, generando datos de ejemplo")
+    
+    # Generar datos sintéticos de placas ecuatorianas
+    np.random.seed(42)
+    
+    # Generar placas ecuatorianas aleatorias (formato ABC-1234) de forma
+    # vectorizada en un arreglo estructurado: letras y dígitos por
+    # separado, sin crear un string de Python por placa
+    n_candidatas = n_samples * 2
+    letras = np.random.randint(65, 91, size=(n_candidatas, 3), dtype=np.uint8)
+    candidatas = np.empty(n_candidatas, dtype=PLATE_DTYPE)
+    candidatas['L'] = letras.view('S3').ravel()
+    candidatas['D'] = np.random.randint(0, 10_000, size=n_candidatas)
+    
+    # Generar placas únicas: se deduplica sobre una clave entera
+    # (letras en base 26 y dígitos) conservando el orden aleatorio
+    clave = (letras.astype(np.int64) - 65) @ np.array([676, 26, 1]) * 10_000
+    clave += candidatas['D']
+    _, primeras = np.unique(clave, return_index=True)
+    placas = candidatas[np.sort(primeras)[:n_samples]]
+    
+    # Ciudades y peajes de Ecuador
+    ubicaciones = ['Quito', 'Guayaquil', 'Cuenca', 'Ambato', 'Riobamba', 
+                  'Manta', 'Machala', 'Santo Domingo']
+    peajes = ['Peaje Oyacoto', 'Peaje Yaguachi', 'Peaje Chivería', 
+             'Peaje San Andrés', 'Peaje Chaquilcay', 'Peaje San Juan',
+             'Peaje Manta-Rocafuerte', 'Peaje El Garrido', 'Peaje Santo Domingo']
+    estados = ['Habilitada', 'Suspendida', 'Bloqueada']
+    
+    # Crear DataFrame
+    df = pd.DataFrame({
+        'id': range(1, n_samples + 1),
+        'placa': _plates_to_str(placas[np.random.choice(len(placas), n_samples)]),
+        'fecha_registro': pd.date_range(
+            start='2020-01-01', 
+            end='2025-12-31', 
+            periods=n_samples
+        ),
+        'estado_ANT': np.random.choice(
+            estados, 
+            n_samples, 
+            p=[0.90, 0.06, 0.04]  # 90% habilitadas, 6% suspendidas, 4% bloqueadas
+        ),
+        'ubicacion_camara': np.random.choice(ubicaciones, n_samples),
+        'peaje_ciudad': np.random.choice(peajes, n_samples)
+    })
+    
+    # Guardar el archivo generado (y su copia Parquet, con fecha_registro
+    # como timestamp INT64 en lugar de texto)
+    save_csv(df, filepath)
+    if PARQUET_AVAILABLE:
+        df.to_parquet(parquet_path, compression='zstd', index=False)
+    log.info("Dataset de ejemplo generado con %d registros", n_samples)
+    
+    return df
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    pd.options.mode.copy_on_write = True
+    
     # Pruebas del módulo
     print("=" * 60)
     print("PRUEBAS DEL MÓDULO DE I/O")
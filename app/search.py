@@ -23,12 +23,57 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 ================================================================================
 """
 
+import logging
 import time
-from typing import Dict, Tuple, List, Optional
-from app.sorting import merge_sort, radix_sort
+from typing import Callable, Dict, Tuple, List, Optional
 
+import numpy as np
 
-def binary_search(sorted_array: List[Dict], target_plate: str) -> Optional[Dict]:
+from app.exceptions import ValidationError
+from app.sorting import merge_sort, radix_sort, encode_plate, plate_search_keys, plate_text
+
+log = logging.getLogger(__name__)
+
+# Último ordenamiento de cada algoritmo cuando se pide reutilizarlo:
+# algoritmo -> (lista de entrada, longitud, (ordenados, métricas, claves)).
+# Se guarda la propia lista para comparar identidad (is) y no solo id(),
+# que Python puede reutilizar tras liberar la lista original.
+_SORT_CACHE: Dict[str, Tuple] = {}
+
+
+def invalidate_sort_cache() -> None:
+    """
+    Descarta los ordenamientos guardados con reuse_sorted=True.
+
+    Debe llamarse si la lista de vehículos se modifica en el lugar (la caché
+    solo detecta listas distintas o de otra longitud).
+    """
+    _SORT_CACHE.clear()
+
+
+def _sort_for_search(algorithm: str, vehicles: List[Dict],
+                     reuse_sorted: bool) -> Tuple[List[Dict], Dict, np.ndarray, bool]:
+    """
+    Ordena vehicles con el algoritmo indicado y retorna también las claves.
+
+    Con reuse_sorted=True reutiliza el último resultado del mismo algoritmo
+    si se recibe la misma lista (y con la misma longitud); el cuarto valor
+    indica si el resultado vino de la caché.
+    """
+    if reuse_sorted:
+        entry = _SORT_CACHE.get(algorithm)
+        if entry is not None and entry[0] is vehicles and entry[1] == len(vehicles):
+            return entry[2] + (True,)
+
+    sort_func = merge_sort if algorithm == 'merge_sort' else radix_sort
+    resultado = sort_func(vehicles, key='placa', return_keys=True)
+    if reuse_sorted:
+        _SORT_CACHE[algorithm] = (vehicles, len(vehicles), resultado)
+    return resultado + (False,)
+
+
+def binary_search(sorted_array: List[Dict], target_plate: str,
+                  sorted_keys: Optional[np.ndarray] = None) -> Optional[Dict]:
     """
     Búsqueda binaria en un arreglo ordenado de vehículos.
 
@@ -47,11 +92,20 @@ def binary_search(sorted_array: List[Dict], target_plate: str) -> Optional[Dict]
 
     REQUISITO CRÍTICO: El arreglo DEBE estar ordenado previamente.
 
+    La comparación se hace sobre las claves enteras de las placas
+    (sorted_keys, producidas por merge_sort/radix_sort con
+    return_keys=True): la placa objetivo se normaliza y codifica una sola
+    vez y cada iteración compara dos enteros, sin procesar texto. Si alguna
+    placa no se pudo codificar, las claves son los textos normalizados y se
+    comparan textos (ver plate_search_keys).
+
     COMPLEJIDAD: O(log n)
 
     Args:
         sorted_array: Lista de diccionarios ordenada por 'placa'
         target_plate: Placa a buscar (ej: "ABC-1234")
+        sorted_keys: Claves paralelas a sorted_array; si es None se
+            calculan aquí con plate_search_keys (O(n))
 
     Returns:
         Dict con información del vehículo, o None si no existe
@@ -65,21 +119,32 @@ def binary_search(sorted_array: List[Dict], target_plate: str) -> Optional[Dict]
     right = len(sorted_array) - 1
     comparisons = 0
 
-    # Normalizar placa objetivo (sin guión, mayúsculas)
-    target_plate = target_plate.replace('-', '').upper()
+    if sorted_keys is None:
+        sorted_keys = plate_search_keys(sorted_array)
+
+    # Normalizar y codificar la placa objetivo una sola vez; una placa que no
+    # se puede codificar no coincide con ninguna clave. Si las claves son los
+    # textos normalizados (placas no codificables), se compara el texto
+    if sorted_keys.dtype == object:
+        target_key = plate_text(target_plate)
+    else:
+        target_key = encode_plate(target_plate)
+        if target_key < 0:
+            return None
+        target_key = np.uint64(target_key)
 
     # Búsqueda binaria clásica
     while left <= right:
         comparisons += 1
         mid = (left + right) // 2
-        mid_plate = sorted_array[mid]['placa'].replace('-', '').upper()
+        mid_key = sorted_keys[mid]
 
-        if mid_plate == target_plate:
+        if mid_key == target_key:
             # ¡Encontrado!
             result = sorted_array[mid].copy()
             result['_search_comparisons'] = comparisons
             return result
-        elif mid_plate < target_plate:
+        elif mid_key < target_key:
             # Buscar en mitad derecha
             left = mid + 1
         else:
@@ -90,7 +155,8 @@ def binary_search(sorted_array: List[Dict], target_plate: str) -> Optional[Dict]
     return None
 
 
-def search_with_merge_sort(vehicles: List[Dict], target_plate: str) -> Dict:
+def search_with_merge_sort(vehicles: List[Dict], target_plate: str,
+                           reuse_sorted: bool = False) -> Dict:
     """
     Busca una placa usando Merge Sort seguido de Binary Search.
 
@@ -112,6 +178,9 @@ def search_with_merge_sort(vehicles: List[Dict], target_plate: str) -> Dict:
     Args:
         vehicles: Lista de diccionarios con datos de vehículos
         target_plate: Placa a buscar
+        reuse_sorted: Si reutilizar el ordenamiento de una llamada anterior
+            con la misma lista (la búsqueda pasa a costar O(log n)). Por
+            defecto se ordena siempre, para medir el costo real del algoritmo
 
     Returns:
         Dict con métricas detalladas:
@@ -124,16 +193,19 @@ def search_with_merge_sort(vehicles: List[Dict], target_plate: str) -> Dict:
         - sort_comparisons: comparaciones durante ordenamiento
         - search_comparisons: comparaciones durante búsqueda
         - total_comparisons: total de comparaciones
+        - sort_cached: si el ordenamiento se reutilizó (sus métricas son las
+          del ordenamiento original y sort_time_ms es casi cero)
     """
-    # PASO 1: Ordenar con Merge Sort
+    # PASO 1: Ordenar con Merge Sort (o reutilizar el orden guardado)
     sort_start = time.perf_counter()
-    sorted_vehicles, sort_metrics = merge_sort(vehicles, key='placa')
+    sorted_vehicles, sort_metrics, sorted_keys, cached = _sort_for_search(
+        'merge_sort', vehicles, reuse_sorted)
     sort_end = time.perf_counter()
     sort_time_ms = (sort_end - sort_start) * 1000
 
     # PASO 2: Buscar con Binary Search
     search_start = time.perf_counter()
-    result = binary_search(sorted_vehicles, target_plate)
+    result = binary_search(sorted_vehicles, target_plate, sorted_keys)
     search_end = time.perf_counter()
     search_time_ms = (search_end - search_start) * 1000
 
@@ -148,13 +220,15 @@ def search_with_merge_sort(vehicles: List[Dict], target_plate: str) -> Dict:
         'sort_comparisons': sort_metrics['comparisons'],
         'search_comparisons': result['_search_comparisons'] if result else 0,
         'total_comparisons': sort_metrics['comparisons'] + (result['_search_comparisons'] if result else 0),
-        'recursive_calls': sort_metrics['recursive_calls']
+        'recursive_calls': sort_metrics['recursive_calls'],
+        'sort_cached': cached
     }
 
     return response
 
 
-def search_with_radix_sort(vehicles: List[Dict], target_plate: str) -> Dict:
+def search_with_radix_sort(vehicles: List[Dict], target_plate: str,
+                           reuse_sorted: bool = False) -> Dict:
     """
     Busca una placa usando Radix Sort seguido de Binary Search.
 
@@ -183,19 +257,21 @@ def search_with_radix_sort(vehicles: List[Dict], target_plate: str) -> Dict:
     Args:
         vehicles: Lista de diccionarios con datos de vehículos
         target_plate: Placa a buscar
+        reuse_sorted: Igual que en search_with_merge_sort
 
     Returns:
         Dict con métricas similares a search_with_merge_sort
     """
-    # PASO 1: Ordenar con Radix Sort
+    # PASO 1: Ordenar con Radix Sort (o reutilizar el orden guardado)
     sort_start = time.perf_counter()
-    sorted_vehicles, sort_metrics = radix_sort(vehicles, key='placa')
+    sorted_vehicles, sort_metrics, sorted_keys, cached = _sort_for_search(
+        'radix_sort', vehicles, reuse_sorted)
     sort_end = time.perf_counter()
     sort_time_ms = (sort_end - sort_start) * 1000
 
     # PASO 2: Buscar con Binary Search
     search_start = time.perf_counter()
-    result = binary_search(sorted_vehicles, target_plate)
+    result = binary_search(sorted_vehicles, target_plate, sorted_keys)
     search_end = time.perf_counter()
     search_time_ms = (search_end - search_start) * 1000
 
@@ -209,13 +285,15 @@ def search_with_radix_sort(vehicles: List[Dict], target_plate: str) -> Dict:
         'total_time_ms': sort_time_ms + search_time_ms,
         'sort_operations': sort_metrics['operations'],
         'search_comparisons': result['_search_comparisons'] if result else 0,
-        'passes': sort_metrics['passes']
+        'passes': sort_metrics['passes'],
+        'sort_cached': cached
     }
 
     return response
 
 
-def comparative_search(vehicles: List[Dict], target_plate: str) -> Dict:
+def comparative_search(vehicles: List[Dict], target_plate: str,
+                       reuse_sorted: bool = False) -> Dict:
     """
     Realiza búsqueda comparativa usando ambos algoritmos en paralelo.
 
@@ -239,6 +317,9 @@ def comparative_search(vehicles: List[Dict], target_plate: str) -> Dict:
     Args:
         vehicles: Lista de vehículos de la base de datos
         target_plate: Placa capturada por la "cámara"
+        reuse_sorted: Si reutilizar los ordenamientos de una búsqueda anterior
+            sobre la misma lista (ver search_with_merge_sort); el valor por
+            defecto mide siempre el ordenamiento completo
 
     Returns:
         Dict con:
@@ -257,11 +338,13 @@ def comparative_search(vehicles: List[Dict], target_plate: str) -> Dict:
         >>> print(f"Ganador: {result['winner']}")
         >>> print(f"Diferencia: {result['percentage_faster']:.2f}%")
     """
-    print(f"🔍 Búsqueda comparativa de placa: {target_plate}")
+    log.info("Búsqueda comparativa de placa: %s", target_plate)
 
-    # Buscar con ambos algoritmos (copias independientes)
-    merge_result = search_with_merge_sort(vehicles.copy(), target_plate)
-    radix_result = search_with_radix_sort(vehicles.copy(), target_plate)
+    # Buscar con ambos algoritmos, uno después del otro: cada tiempo se mide
+    # sin competir por el GIL con el otro algoritmo. No se copia la lista:
+    # ambos ordenamientos construyen listas nuevas y no modifican vehicles
+    merge_result = search_with_merge_sort(vehicles, target_plate, reuse_sorted)
+    radix_result = search_with_radix_sort(vehicles, target_plate, reuse_sorted)
 
     # Extraer tiempos para comparación
     merge_time = merge_result['total_time_ms']
@@ -278,9 +361,9 @@ def comparative_search(vehicles: List[Dict], target_plate: str) -> Dict:
         percentage = (time_diff / merge_time) * 100
 
     # Logging para consola (debugging)
-    print(f"   Merge Sort: {merge_time:.4f} ms")
-    print(f"   Radix Sort: {radix_time:.4f} ms")
-    print(f"   🏆 Ganador: {winner} ({percentage:.2f}% más rápido)")
+    log.info("   Merge Sort: %.4f ms", merge_time)
+    log.info("   Radix Sort: %.4f ms", radix_time)
+    log.info("   Ganador: %s (%.2f%% más rápido)", winner, percentage)
 
     # Retornar resultados completos
     return {
@@ -295,7 +378,119 @@ def comparative_search(vehicles: List[Dict], target_plate: str) -> Dict:
     }
 
 
+def _check_algorithm(algorithm: str) -> None:
+    """Valida el nombre de algoritmo de search_many/search_stream."""
+    if algorithm not in ('merge_sort', 'radix_sort'):
+        raise ValidationError(
+            f"Algoritmo no soportado: {algorithm}",
+            field='algorithm',
+            value=algorithm,
+            expected_format="'merge_sort' o 'radix_sort'"
+        )
+
+
+def search_many(vehicles: List[Dict], plates: List[str],
+                algorithm: str = 'radix_sort') -> Dict:
+    """
+    Busca varias placas ordenando los vehículos una sola vez.
+
+    Una caseta de peaje lee muchas placas contra la misma base de datos:
+    en lugar de ordenar en cada consulta (O(k · n log n) para k placas), se
+    ordena una vez y cada placa cuesta solo una búsqueda binaria, con un
+    total de O(n log n + k log n).
+
+    Args:
+        vehicles: Lista de diccionarios con datos de vehículos
+        plates: Placas a buscar
+        algorithm: 'merge_sort' o 'radix_sort' (default: 'radix_sort')
+
+    Returns:
+        Dict con:
+        - algorithm: algoritmo de ordenamiento usado
+        - sort_time_ms: tiempo del único ordenamiento
+        - search_time_ms: tiempo total de las búsquedas
+        - total_time_ms: tiempo total
+        - sort_metrics: métricas del ordenamiento
+        - results: una entrada por placa con plate, found, vehicle y
+          search_comparisons, en el orden de plates
+
+    Raises:
+        ValidationError: Si el algoritmo no es 'merge_sort' ni 'radix_sort'
+
+    Example:
+        >>> batch = search_many(vehicles, ['ABC-1234', 'XYZ-9999'])
+        >>> [r['found'] for r in batch['results']]
+    """
+    _check_algorithm(algorithm)
+
+    sort_start = time.perf_counter()
+    sorted_vehicles, sort_metrics, sorted_keys, _ = _sort_for_search(
+        algorithm, vehicles, reuse_sorted=False)
+    sort_time_ms = (time.perf_counter() - sort_start) * 1000
+
+    search_start = time.perf_counter()
+    results = []
+    for plate in plates:
+        vehicle = binary_search(sorted_vehicles, plate, sorted_keys)
+        results.append({
+            'plate': plate,
+            'found': vehicle is not None,
+            'vehicle': vehicle,
+            'search_comparisons': vehicle['_search_comparisons'] if vehicle else 0
+        })
+    search_time_ms = (time.perf_counter() - search_start) * 1000
+
+    log.info("Búsqueda por lote: %d placas, %d encontradas (%s)",
+             len(plates), sum(r['found'] for r in results), algorithm)
+
+    return {
+        'algorithm': algorithm,
+        'sort_time_ms': sort_time_ms,
+        'search_time_ms': search_time_ms,
+        'total_time_ms': sort_time_ms + search_time_ms,
+        'sort_metrics': sort_metrics,
+        'results': results
+    }
+
+
+def search_stream(vehicles: List[Dict],
+                  algorithm: str = 'radix_sort') -> Callable[[str], Optional[Dict]]:
+    """
+    Ordena los vehículos una vez y retorna una función de búsqueda O(log n).
+
+    Variante continua de search_many para placas que llegan de a una: la
+    función retornada conserva la lista ordenada y sus claves, y responde
+    como binary_search.
+
+    Args:
+        vehicles: Lista de diccionarios con datos de vehículos (no debe
+            modificarse mientras se use la función retornada)
+        algorithm: 'merge_sort' o 'radix_sort' (default: 'radix_sort')
+
+    Returns:
+        Callable que recibe una placa y retorna el vehículo (con
+        '_search_comparisons') o None
+
+    Raises:
+        ValidationError: Si el algoritmo no es 'merge_sort' ni 'radix_sort'
+
+    Example:
+        >>> buscar = search_stream(vehicles)
+        >>> buscar('ABC-1234')
+    """
+    _check_algorithm(algorithm)
+    sorted_vehicles, _, sorted_keys, _ = _sort_for_search(
+        algorithm, vehicles, reuse_sorted=False)
+
+    def buscar(plate: str) -> Optional[Dict]:
+        return binary_search(sorted_vehicles, plate, sorted_keys)
+
+    return buscar
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Pruebas del módulo
     print("=" * 70)
     print("PRUEBAS DEL MÓDULO DE BÚSQUEDA")
@@ -14,24 +14,269 @@ COMPLEJIDAD ALGORÍTMICA:
 - Merge Sort: O(n log n) en todos los casos
 - Radix Sort: O(d * (n + k)) donde d=dígitos, k=rango de valores
 
+CLAVES NUMÉRICAS:
+Antes de ordenar, cada placa se normaliza una sola vez (sin guión, en
+mayúsculas) y se codifica como un entero en base 37 (ver encode_plate_keys).
+Ambos algoritmos trabajan sobre esas claves, sin volver a normalizar texto
+en cada comparación o pasada. Si alguna placa no se puede codificar (otros
+caracteres, más de MAX_KEY_LENGTH caracteres o un valor que no es texto),
+se ordena por el texto normalizado (ver plate_text), más lento pero con el
+mismo orden.
+
 Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo, 
          Estefany Condor, Natasha Nuñez, Elmer Rivadeneira
 ================================================================================
 """
 
+import math
 import time
-import copy
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
 import numpy as np
 
 from app.exceptions import SortingError, TransformError
 
 
+# ============================================================================
+# CODIFICACIÓN DE PLACAS EN CLAVES ENTERAS
+# ============================================================================
+
+# Base de las claves: 1 relleno + 10 dígitos + 26 letras
+KEY_RADIX = 37
+
+# Longitud máxima de clave que cabe en un uint64 (37**12 < 2**64)
+MAX_KEY_LENGTH = 12
+
+# Tabla de 256 entradas byte → dígito en base 37. El relleno ('\0') vale 0,
+# '0'-'9' valen 1-10 y 'A'-'Z' valen 11-36, de modo que el orden numérico de
+# las claves coincide con el orden lexicográfico del texto normalizado. Las
+# minúsculas valen lo mismo que su mayúscula (la tabla también normaliza).
+# Cualquier otro byte queda marcado como inválido.
+_INVALID_CHAR = 255
+_CHAR_LUT = np.full(256, _INVALID_CHAR, dtype=np.uint8)
+_CHAR_LUT[0] = 0
+_CHAR_LUT[ord('0'):ord('9') + 1] = np.arange(1, 11)
+_CHAR_LUT[ord('A'):ord('Z') + 1] = np.arange(11, 37)
+_CHAR_LUT[ord('a'):ord('z') + 1] = np.arange(11, 37)
+
+# La misma tabla como bytes, para consultas escalares desde Python
+# (indexar bytes retorna un int sin crear escalares de NumPy)
+_CHAR_LUT_BYTES = _CHAR_LUT.tobytes()
+
+
+def _fixed_width_digits(placas: List[str]) -> Optional[np.ndarray]:
+    """
+    Camino rápido de plate_digit_matrix para placas de formato uniforme.
+    
+    Si todas las placas tienen la misma longitud, son ASCII y tienen el
+    guión en las mismas posiciones (ej. 'ABC-1234'), se normalizan en bloque:
+    un solo buffer de bytes en forma (n, longitud), se descartan las
+    columnas de guión y la tabla _CHAR_LUT resuelve las mayúsculas, sin
+    procesar cada texto en Python. Retorna None si no aplica.
+    """
+    longitud = len(placas[0])
+    if any(len(p) != longitud for p in placas):
+        return None
+    try:
+        buffer = ''.join(placas).encode('ascii')
+    except UnicodeEncodeError:
+        return None
+    
+    caracteres = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, longitud)
+    guiones = caracteres == ord('-')
+    columnas_guion = guiones[0]
+    if not (guiones == columnas_guion).all():
+        return None
+    return _CHAR_LUT[caracteres[:, ~columnas_guion]]
+
+
+def plate_digit_matrix(arr: List[Dict], key: str = 'placa') -> np.ndarray:
+    """
+    Convierte las placas en una matriz (n, longitud) de dígitos en base 37.
+    
+    Cada placa se normaliza una sola vez (sin guión, mayúsculas); las más
+    cortas se rellenan a la derecha hasta la longitud máxima. Los caracteres
+    pasan por la tabla _CHAR_LUT en bloque, sin ramas por carácter. Las
+    placas de formato uniforme (el caso de la base de datos) se normalizan
+    directamente sobre los bytes, sin crear un texto nuevo por placa.
+    
+    Args:
+        arr (List[Dict]): Lista de diccionarios con la clave a codificar
+        key (str): Clave del diccionario con la placa (default: 'placa')
+        
+    Returns:
+        np.ndarray: Matriz uint8 con un dígito (0-36) por carácter; la
+        columna 0 es el carácter más significativo
+        
+    Raises:
+        ValueError: Si una placa no es texto, tiene caracteres fuera de
+            0-9/A-Z o supera MAX_KEY_LENGTH caracteres
+    """
+    placas = [item[key] for item in arr]
+    if not placas:
+        return np.empty((0, 0), dtype=np.uint8)
+    if not all(isinstance(p, str) for p in placas):
+        raise ValueError("Placa vacía o que no es texto")
+    
+    digitos = _fixed_width_digits(placas)
+    if digitos is not None and digitos.shape[1] <= MAX_KEY_LENGTH:
+        if (digitos == _INVALID_CHAR).any():
+            raise ValueError("Placa con caracteres fuera de 0-9 y A-Z")
+        return digitos
+    
+    normalizadas = [p.replace('-', '').upper() for p in placas]
+    longitud = max(map(len, normalizadas))
+    if longitud > MAX_KEY_LENGTH:
+        raise ValueError(f"Placa de más de {MAX_KEY_LENGTH} caracteres")
+    
+    try:
+        buffer = ''.join(p.ljust(longitud, '\0') for p in normalizadas).encode('ascii')
+    except UnicodeEncodeError:
+        raise ValueError("Placa con caracteres no ASCII")
+    
+    digitos = _CHAR_LUT[np.frombuffer(buffer, dtype=np.uint8)].reshape(-1, longitud)
+    if (digitos == _INVALID_CHAR).any():
+        raise ValueError("Placa con caracteres fuera de 0-9 y A-Z")
+    return digitos
+
+
+def _keys_from_digits(digitos: np.ndarray) -> np.ndarray:
+    """
+    Acumula una matriz de dígitos en claves uint64 de MAX_KEY_LENGTH dígitos.
+    
+    Horner (×37) vectorizado por posición; las posiciones que faltan hasta
+    MAX_KEY_LENGTH son relleno (0), así que la clave de una placa no depende
+    de la longitud de las demás.
+    """
+    n, longitud = digitos.shape
+    claves = np.zeros(n, dtype=np.uint64)
+    for posicion in range(longitud):
+        claves = claves * np.uint64(KEY_RADIX) + digitos[:, posicion]
+    return claves * np.uint64(KEY_RADIX ** (MAX_KEY_LENGTH - longitud))
+
+
+def encode_plate_keys(arr: List[Dict], key: str = 'placa') -> np.ndarray:
+    """
+    Codifica las placas de una lista de diccionarios como claves uint64.
+    
+    Los dígitos de plate_digit_matrix se acumulan con Horner (×37), una
+    operación vectorizada por posición. Todas las claves tienen
+    MAX_KEY_LENGTH dígitos (relleno a la derecha), por lo que se pueden
+    comparar con la de encode_plate.
+    
+    Args:
+        arr (List[Dict]): Lista de diccionarios con la clave a codificar
+        key (str): Clave del diccionario con la placa (default: 'placa')
+        
+    Returns:
+        np.ndarray: Claves uint64, una por elemento y en el mismo orden
+        
+    Raises:
+        ValueError: Si una placa no es texto, tiene caracteres fuera de
+            0-9/A-Z o supera MAX_KEY_LENGTH caracteres
+        
+    Example:
+        >>> claves = encode_plate_keys([{'placa': 'ABC-1234'}])
+        >>> int(claves[0]) == encode_plate('ABC-1234')
+        True
+    """
+    return _keys_from_digits(plate_digit_matrix(arr, key))
+
+
+def encode_plate(plate: str) -> int:
+    """
+    Codifica una sola placa con la misma clave que encode_plate_keys.
+    
+    Se usa para la placa buscada: se normaliza una sola vez por búsqueda.
+    
+    Args:
+        plate (str): Placa a codificar (ej. "ABC-1234")
+        
+    Returns:
+        int: Clave en base 37, o -1 si la placa no se puede codificar
+        (no puede coincidir con ninguna clave)
+    """
+    normalizada = plate.replace('-', '')
+    if len(normalizada) > MAX_KEY_LENGTH:
+        return -1
+    try:
+        datos = normalizada.ljust(MAX_KEY_LENGTH, '\0').encode('ascii')
+    except UnicodeEncodeError:
+        return -1
+    # Una consulta a la tabla por byte (también resuelve las minúsculas)
+    clave = 0
+    for byte in datos:
+        digito = _CHAR_LUT_BYTES[byte]
+        if digito == _INVALID_CHAR:
+            return -1
+        clave = clave * KEY_RADIX + digito
+    return clave
+
+
+def plate_text(plate: Any) -> str:
+    """
+    Texto normalizado de una placa (sin guión, mayúsculas), o '' si no es
+    texto (ej. NaN). Para placas codificables, el orden de estos textos es
+    el mismo que el de sus claves en base 37.
+    """
+    if not isinstance(plate, str):
+        return ''
+    return plate.replace('-', '').upper()
+
+
+def _text_sort_keys(arr: List[Dict], key: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Claves de respaldo para placas que no se pueden codificar en base 37.
+    
+    Retorna el rango denso de cada texto normalizado (int64, mismo orden que
+    el texto, empates con el mismo rango) y los textos (arreglo object).
+    """
+    textos = [plate_text(item[key]) for item in arr]
+    rango = {texto: i for i, texto in enumerate(sorted(set(textos)))}
+    rangos = np.fromiter((rango[texto] for texto in textos), dtype=np.int64,
+                         count=len(textos))
+    return rangos, np.array(textos, dtype=object)
+
+
+def _text_digit_matrix(arr: List[Dict], key: str) -> Tuple[np.ndarray, int]:
+    """
+    Matriz de dígitos de respaldo para Radix Sort (placas no codificables).
+    
+    Cada carácter distinto del texto normalizado recibe un dígito 1..k en
+    orden de carácter (0 sigue siendo el relleno), así que el orden por
+    dígitos coincide con el del texto. Retorna la matriz uint32 (n, longitud)
+    y la base (k + 1).
+    """
+    textos = [plate_text(item[key]) for item in arr]
+    alfabeto = sorted(set(''.join(textos)))
+    valor = {caracter: i + 1 for i, caracter in enumerate(alfabeto)}
+    longitud = max(map(len, textos))
+    digitos = np.zeros((len(textos), longitud), dtype=np.uint32)
+    for fila, texto in enumerate(textos):
+        digitos[fila, :len(texto)] = [valor[caracter] for caracter in texto]
+    return digitos, len(alfabeto) + 1
+
+
+def plate_search_keys(arr: List[Dict], key: str = 'placa') -> np.ndarray:
+    """
+    Claves comparables de las placas, en el mismo orden que arr.
+    
+    Son las claves uint64 de encode_plate_keys o, si alguna placa no se puede
+    codificar, los textos normalizados de plate_text (arreglo object); es el
+    mismo tipo de claves que retornan merge_sort y radix_sort con
+    return_keys=True.
+    """
+    try:
+        return encode_plate_keys(arr, key)
+    except ValueError:
+        return _text_sort_keys(arr, key)[1]
+
+
 # ============================================================================
 # MERGE SORT - Algoritmo de divide y vencerás
 # ============================================================================
 
-def merge_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
+def merge_sort(arr: List[Dict], key: str = 'placa', return_keys: bool = False,
+               mode: str = 'recursive') -> Tuple:
     """
     Implementación del algoritmo Merge Sort para ordenar placas vehiculares.
     
@@ -57,15 +302,41 @@ def merge_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
     - Requiere O(n) espacio adicional
     - Mayor overhead para conjuntos pequeños
     
+    IMPLEMENTACIÓN (parámetro mode):
+    - 'recursive' (default): versión recursiva de arriba hacia abajo escrita
+      en Python, que cuenta comparaciones y llamadas recursivas exactas.
+    - 'iterative': versión de abajo hacia arriba (tramos de ancho 1, 2, 4...)
+      sin llamadas recursivas; cuenta comparaciones exactas, deja
+      'recursive_calls' en 0 y agrega 'passes' (⌈log2 n⌉ fusiones por nivel).
+      Al fusionar otros tramos, sus comparaciones pueden diferir levemente.
+    - 'builtin': las mismas claves empaquetadas se ordenan con list.sort
+      (Timsort, un merge sort natural implementado en C): mismo resultado,
+      mucho más rápido, pero 'comparisons' es la cota n·⌈log2 n⌉
+      (metrics['comparisons_estimated']) y 'recursive_calls' queda en 0.
+    
     Args:
         arr (List[Dict]): Lista de diccionarios a ordenar
         key (str): Clave del diccionario por la cual ordenar (default: 'placa')
+        return_keys (bool): Si también retornar las claves ordenadas
+        mode (str): 'recursive', 'iterative' o 'builtin' (default: 'recursive')
         
     Returns:
-        Tuple[List[Dict], Dict]: Lista ordenada y métricas de rendimiento
+        Tuple[List[Dict], Dict]: Lista ordenada y métricas de rendimiento;
+        con return_keys=True se agrega un tercer elemento: np.ndarray con la
+        clave de cada elemento ordenado (para binary_search; ver
+        plate_search_keys)
+        
+    PRECONDICIÓN:
+    Las claves rápidas (uint64) requieren placas de texto con caracteres
+    0-9/A-Z (se ignora el guión y las minúsculas valen su mayúscula) y a lo
+    sumo MAX_KEY_LENGTH caracteres. Si alguna no cumple (ej. 'Ñ', espacios,
+    '/', NaN), se ordena por el rango de su texto normalizado: mismo orden
+    (NaN cuenta como ''), pero con un paso previo más costoso, y las claves
+    retornadas son esos textos.
         
     Raises:
-        SortingError: Si ocurre un error durante el ordenamiento
+        SortingError: Si ocurre un error durante el ordenamiento o el modo
+            no es válido
         
     Example:
         >>> data = [{'placa': 'XYZ-1234'}, {'placa': 'ABC-5678'}]
@@ -84,75 +355,150 @@ def merge_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
     comparisons = [0]  # Lista para modificar en función anidada
     recursive_calls = [0]
     
-    def merge(left: List[Dict], right: List[Dict]) -> List[Dict]:
+    def merge(src: List[int], dst: List[int], lo: int, mid: int, hi: int) -> None:
         """
-        Función auxiliar para fusionar dos listas ordenadas.
+        Función auxiliar para fusionar dos tramos ordenados.
         
-        Esta es la operación clave de Merge Sort. Combina dos sublistas
-        ya ordenadas en una sola lista ordenada.
+        Esta es la operación clave de Merge Sort. Combina los tramos ya
+        ordenados src[lo:mid] y src[mid:hi] en dst[lo:hi], escribiendo por
+        índice sin crear listas nuevas. Cada valor empaqueta la clave de la
+        placa y el índice del elemento (clave * n + índice), así que se
+        comparan enteros directamente, sin consultar otra lista.
         
-        Complejidad: O(n) donde n = len(left) + len(right)
+        Complejidad: O(n) donde n = hi - lo
         """
-        result = []
-        i = j = 0
-        
-        while i < len(left) and j < len(right):
-            comparisons[0] += 1
-            
-            # Extraer valores para comparación (sin guión para orden lexicográfico correcto)
-            left_val = left[i][key].replace('-', '').upper()
-            right_val = right[j][key].replace('-', '').upper()
-            
-            if left_val <= right_val:
-                result.append(left[i])
+        i, j, k = lo, mid, lo
+        # Valores actuales de cada tramo: cada elemento se lee de src una
+        # sola vez (ambos tramos tienen al menos un elemento)
+        a, b = src[i], src[j]
+        
+        while True:
+            # Comparar enteros empaquetados (mismo orden que el texto sin
+            # guión y en mayúsculas; a igual placa decide el índice, lo que
+            # equivale al <= estable sobre la placa)
+            if a <= b:
+                dst[k] = a
+                k += 1
                 i += 1
+                if i == mid:
+                    break
+                a = src[i]
             else:
-                result.append(right[j])
+                dst[k] = b
+                k += 1
                 j += 1
+                if j == hi:
+                    break
+                b = src[j]
         
-        # Agregar elementos restantes (ya están ordenados)
-        result.extend(left[i:])
-        result.extend(right[j:])
+        # Cada iteración hizo una comparación y escribió un elemento: el
+        # conteo se suma una vez por fusión, no en cada iteración
+        comparisons[0] += k - lo
         
-        return result
+        # Copiar el tramo restante (ya está ordenado)
+        if i < mid:
+            dst[k:hi] = src[i:mid]
+        else:
+            dst[k:hi] = src[j:hi]
     
-    def _merge_sort(arr: List[Dict]) -> List[Dict]:
+    def _merge_sort(src: List[int], dst: List[int], lo: int, hi: int) -> None:
         """
-        Función recursiva principal de Merge Sort.
+        Función recursiva principal de Merge Sort sobre el tramo [lo, hi).
         
-        Implementa la división recursiva del arreglo hasta llegar a
-        subarreglos de tamaño 1 (caso base), luego combina.
+        Implementa la división recursiva por rangos de índices hasta llegar
+        a tramos de tamaño 1 (caso base), luego combina. Las dos listas
+        tienen el mismo contenido al entrar; el resultado queda en dst y
+        cada nivel alterna los papeles de origen y destino, por lo que no
+        se copian mitades en cada llamada.
         """
         recursive_calls[0] += 1
         
-        # Caso base: arreglo de 0 o 1 elemento ya está ordenado
-        if len(arr) <= 1:
-            return arr
+        # Caso base: tramo de 0 o 1 elemento ya está ordenado
+        if hi - lo <= 1:
+            return
         
         # Dividir: encontrar el punto medio
-        mid = len(arr) // 2
+        mid = lo + (hi - lo) // 2
+        
+        # Conquistar: ordenar recursivamente cada mitad (dejándolas en src)
+        _merge_sort(dst, src, lo, mid)
+        _merge_sort(dst, src, mid, hi)
         
-        # Conquistar: ordenar recursivamente cada mitad
-        left = _merge_sort(arr[:mid])
-        right = _merge_sort(arr[mid:])
+        # Combinar: fusionar las mitades ordenadas en dst
+        merge(src, dst, lo, mid, hi)
+    
+    def _merge_sort_iterative(src: List[int], dst: List[int], n: int) -> List[int]:
+        """
+        Merge Sort de abajo hacia arriba, sin recursión.
         
-        # Combinar: fusionar las mitades ordenadas
-        return merge(left, right)
+        En cada pasada fusiona pares de tramos ordenados de ancho width de
+        src en dst (un tramo sin pareja se copia tal cual) y luego duplica el
+        ancho, alternando los papeles de las dos listas. Retorna la lista que
+        contiene el resultado.
+        """
+        width = 1
+        while width < n:
+            for lo in range(0, n, 2 * width):
+                mid = min(lo + width, n)
+                hi = min(lo + 2 * width, n)
+                if mid < hi:
+                    merge(src, dst, lo, mid, hi)
+                else:
+                    dst[lo:hi] = src[lo:hi]
+            src, dst = dst, src
+            width *= 2
+            metrics['passes'] += 1
+        return src
+    
+    if mode not in ('recursive', 'iterative', 'builtin'):
+        raise SortingError(
+            f"Modo de Merge Sort no soportado: {mode}",
+            algorithm="merge_sort",
+            data_size=len(arr)
+        )
+    if mode == 'iterative':
+        metrics['passes'] = 0
     
     try:
         # Medir tiempo de ejecución
         start_time = time.perf_counter()
         
-        # Ejecutar ordenamiento
-        result = _merge_sort(arr.copy())
+        # Codificar las placas una sola vez y empaquetar clave e índice en un
+        # solo entero; al final el índice se recupera con el módulo
+        n = len(arr)
+        try:
+            claves = encode_plate_keys(arr, key)
+            claves_orden = claves
+        except ValueError:
+            claves_orden, claves = _text_sort_keys(arr, key)
+        empaquetados = [clave * n + i for i, clave in enumerate(claves_orden.tolist())]
+        if mode == 'builtin':
+            # Los valores empaquetados son únicos: el orden de list.sort
+            # coincide con el del merge estable sobre la placa
+            empaquetados.sort()
+        elif mode == 'iterative':
+            empaquetados = _merge_sort_iterative(empaquetados, [None] * n, n)
+        else:
+            # Única copia auxiliar, reservada una sola vez para todo el
+            # ordenamiento
+            auxiliar = empaquetados.copy()
+            _merge_sort(auxiliar, empaquetados, 0, n)
+        orden = [valor % n for valor in empaquetados]
+        result = [arr[i] for i in orden]
         
         end_time = time.perf_counter()
         
         # Actualizar métricas
-        metrics['comparisons'] = comparisons[0]
+        if mode == 'builtin':
+            metrics['comparisons'] = n * math.ceil(math.log2(n)) if n > 1 else 0
+            metrics['comparisons_estimated'] = True
+        else:
+            metrics['comparisons'] = comparisons[0]
         metrics['recursive_calls'] = recursive_calls[0]
         metrics['execution_time_ms'] = (end_time - start_time) * 1000
         
+        if return_keys:
+            return result, metrics, claves[orden]
         return result, metrics
         
     except Exception as e:
@@ -168,7 +514,8 @@ def merge_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
 # RADIX SORT - Algoritmo de ordenamiento por dígitos
 # ============================================================================
 
-def radix_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
+def radix_sort(arr: List[Dict], key: str = 'placa', return_keys: bool = False,
+               vectorized: bool = False) -> Tuple:
     """
     Implementación del algoritmo Radix Sort (LSD) para placas vehiculares.
     
@@ -201,12 +548,35 @@ def radix_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
     - Menos eficiente cuando d es grande
     - Overhead significativo para conjuntos pequeños
     
+    IMPLEMENTACIÓN:
+    Por defecto cada pasada es el Counting Sort paso a paso en Python, la
+    misma base que Merge Sort, de modo que la comparación de tiempos entre
+    ambos algoritmos es justa. Con vectorized=True cada pasada se ejecuta
+    con NumPy sobre la columna de dígitos (np.bincount para el conteo y un
+    argsort estable sobre uint8 para la dispersión), con el mismo resultado
+    y las mismas métricas; solo debe usarse donde no se reporta una
+    comparación de rendimiento.
+    
     Args:
         arr (List[Dict]): Lista de diccionarios a ordenar
         key (str): Clave del diccionario por la cual ordenar
+        return_keys (bool): Si también retornar las claves ordenadas
+        vectorized (bool): Si ejecutar las pasadas con NumPy (default: False)
         
     Returns:
-        Tuple[List[Dict], Dict]: Lista ordenada y métricas de rendimiento
+        Tuple[List[Dict], Dict]: Lista ordenada y métricas de rendimiento;
+        con return_keys=True se agrega un tercer elemento: np.ndarray con la
+        clave de cada elemento ordenado (para binary_search; ver
+        plate_search_keys)
+        
+    PRECONDICIÓN:
+    Los dígitos en base 37 requieren placas de texto con caracteres 0-9/A-Z
+    (se ignora el guión y las minúsculas valen su mayúscula) y a lo sumo
+    MAX_KEY_LENGTH caracteres. Si alguna no cumple (ej. 'Ñ', espacios, '/',
+    NaN), cada carácter distinto del texto normalizado recibe su propio
+    dígito (metrics['buckets_used'] es esa base): mismo orden que el texto
+    (NaN cuenta como ''), con un paso previo más costoso, y las claves
+    retornadas son esos textos.
         
     Raises:
         SortingError: Si ocurre un error durante el ordenamiento
@@ -215,7 +585,7 @@ def radix_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
         'algorithm': 'Radix Sort',
         'operations': 0,
         'passes': 0,
-        'buckets_used': 37,  # 0-9, A-Z, padding
+        'buckets_used': KEY_RADIX,  # padding, 0-9, A-Z
         'input_size': len(arr),
         'execution_time_ms': 0
     }
@@ -223,65 +593,57 @@ def radix_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
     operations = [0]
     
     if len(arr) == 0:
+        if return_keys:
+            return arr, metrics, np.empty(0, dtype=np.uint64)
         return arr, metrics
     
-    def get_key_value(item: Dict) -> str:
-        """Extrae y normaliza el valor de la clave para ordenamiento."""
-        return item[key].replace('-', '').upper()
+    # Dígitos (0-36) del carácter de la pasada actual, uno por elemento
+    columna = []
     
-    # Encontrar la longitud máxima de las claves
-    max_length = max(len(get_key_value(item)) for item in arr)
+    # Arreglo de conteo compartido por todas las pasadas (se reinicia en el
+    # lugar en cada una, sin crear una lista nueva); se dimensiona con la
+    # base de los dígitos al codificar las placas
+    count = []
+    ceros = []
     
-    def counting_sort_by_position(arr: List[Dict], position: int) -> List[Dict]:
+    def counting_sort_by_position(arr: List[int], output: List[int],
+                                  position: int) -> List[int]:
         """
         Counting Sort estable para una posición de carácter específica.
         
         Esta es la subrutina clave de Radix Sort. Ordena los elementos
-        basándose en un solo carácter en la posición especificada.
+        (índices) basándose en un solo carácter en la posición especificada.
         
         Args:
-            arr: Lista a ordenar
+            arr: Lista de índices a ordenar
+            output: Lista de la misma longitud donde escribir el resultado
+                (se reutiliza entre pasadas)
             position: Posición del carácter (desde la derecha, empezando en 0)
             
         Returns:
             Lista ordenada por el carácter en la posición especificada
+            (output, o arr sin cambios si no hubo que mover nada)
         """
-        # RADIX = 37: 10 dígitos (0-9) + 26 letras (A-Z) + 1 padding
-        RADIX = 37
-        count = [0] * RADIX
-        output = [None] * len(arr)
-        
-        def char_to_index(char: str) -> int:
-            """
-            Convierte un carácter a su índice en el arreglo de conteo.
-            
-            Mapeo:
-            - Dígitos '0'-'9': índices 0-9
-            - Letras 'A'-'Z': índices 10-35
-            - Padding (vacío): índice 36
-            """
-            operations[0] += 1
-            
-            if char == '':
-                return 36  # Padding para strings más cortos
-            elif char.isdigit():
-                return int(char)
-            else:
-                return ord(char.upper()) - ord('A') + 10
+        # RADIX = 37: 1 padding + 10 dígitos (0-9) + 26 letras (A-Z)
+        RADIX = len(count)
+        count[:] = ceros
         
-        def get_char_at_position(item: Dict, pos: int) -> str:
-            """Obtiene el carácter en la posición especificada (desde la derecha)."""
-            s = get_key_value(item)
-            idx = len(s) - 1 - pos  # Posición desde la derecha
-            if idx < 0:
-                return ''  # Padding
-            return s[idx]
+        # El índice en el arreglo de conteo del carácter en la posición
+        # actual es su dígito precalculado, columna[item] (ver _CHAR_LUT):
+        # - Padding: índice 0
+        # - Dígitos '0'-'9': índices 1-10
+        # - Letras 'A'-'Z': índices 11-36
+        # Cada consulta cuenta como una operación; el conteo se suma por bloque
         
         # PASO 1: Contar ocurrencias de cada carácter en la posición actual
         for item in arr:
-            char = get_char_at_position(item, position)
-            index = char_to_index(char)
-            count[index] += 1
+            count[columna[item]] += 1
+        operations[0] += len(arr)
+        
+        # Si todos los elementos comparten el carácter de esta posición, el
+        # Counting Sort estable dejaría el orden igual: se omite la dispersión
+        if max(count) == len(arr):
+            return arr
         
         # PASO 2: Calcular posiciones acumulativas
         # count[i] ahora contiene la posición donde termina el grupo i
@@ -291,27 +653,99 @@ def radix_sort(arr: List[Dict], key: str = 'placa') -> Tuple[List[Dict], Dict]:
         # PASO 3: Construir arreglo de salida (de derecha a izquierda para estabilidad)
         for i in range(len(arr) - 1, -1, -1):
             item = arr[i]
-            char = get_char_at_position(item, position)
-            index = char_to_index(char)
+            index = columna[item]
             count[index] -= 1
             output[count[index]] = item
+        operations[0] += len(arr)
         
         return output
     
+    def counting_sort_vectorized(arr: np.ndarray, output: np.ndarray,
+                                 digitos_columna: np.ndarray) -> np.ndarray:
+        """
+        La misma pasada de Counting Sort estable, ejecutada con NumPy.
+        
+        Args:
+            arr: Permutación actual (índices)
+            output: Arreglo de la misma longitud donde escribir el resultado
+            digitos_columna: Dígito de cada elemento en la posición actual
+            
+        Returns:
+            Permutación ordenada por el dígito de la posición actual
+            (output, o arr sin cambios si no hubo que mover nada)
+        """
+        digitos_pasada = digitos_columna[arr]
+        operations[0] += len(arr)
+        
+        # PASO 1: Contar ocurrencias de cada dígito (mismo atajo que la
+        # versión en Python si todos caen en el mismo grupo)
+        count = np.bincount(digitos_pasada, minlength=len(ceros))
+        if count.max() == len(arr):
+            return arr
+        
+        # PASOS 2 y 3: Posiciones acumuladas y dispersión estable; el
+        # argsort estable de NumPy sobre uint8 es a su vez un conteo
+        operations[0] += len(arr)
+        return np.take(arr, np.argsort(digitos_pasada, kind='stable'), out=output)
+    
     try:
         start_time = time.perf_counter()
         
-        # Aplicar Counting Sort para cada posición (LSD a MSD)
-        result = arr.copy()
+        # Convertir las placas una sola vez en una matriz (n, max_length) de
+        # dígitos: cada pasada solo lee una columna, sin procesar texto
+        try:
+            digitos = plate_digit_matrix(arr, key)
+            base = KEY_RADIX
+            claves = _keys_from_digits(digitos)
+            claves_retorno = claves
+        except ValueError:
+            digitos, base = _text_digit_matrix(arr, key)
+            claves, claves_retorno = _text_sort_keys(arr, key)
+            metrics['buckets_used'] = base
+        max_length = digitos.shape[1]
+        count[:] = [0] * base
+        ceros[:] = count
+        
+        # Aplicar Counting Sort para cada posición (LSD a MSD) sobre índices.
+        # Si antes de una pasada los elementos ya están ordenados por la clave
+        # completa, las pasadas restantes (estables) no los moverían: se
+        # termina antes (la comprobación es vectorizada y cuesta mucho menos
+        # que una pasada)
+        # Doble búfer: cada pasada escribe en el búfer libre y luego ambos
+        # intercambian papeles, sin reservar una salida nueva por pasada
+        if vectorized:
+            orden = np.arange(len(arr))
+            buffer = np.empty_like(orden)
+        else:
+            orden = list(range(len(arr)))
+            buffer = [None] * len(arr)
         for position in range(max_length):
-            result = counting_sort_by_position(result, position)
+            claves_actuales = claves[orden]
+            if (claves_actuales[1:] >= claves_actuales[:-1]).all():
+                break
+            digitos_columna = digitos[:, max_length - 1 - position]
+            if vectorized:
+                nuevo = counting_sort_vectorized(orden, buffer, digitos_columna)
+            else:
+                columna[:] = digitos_columna.tolist()
+                nuevo = counting_sort_by_position(orden, buffer, position)
+            if nuevo is buffer:
+                buffer = orden
+            orden = nuevo
             metrics['passes'] += 1
+        if vectorized:
+            orden = orden.tolist()
+        result = [arr[i] for i in orden]
+        if return_keys:
+            claves_ordenadas = claves_retorno[orden]
         
         end_time = time.perf_counter()
         
         metrics['operations'] = operations[0]
         metrics['execution_time_ms'] = (end_time - start_time) * 1000
         
+        if return_keys:
+            return result, metrics, claves_ordenadas
         return result, metrics
         
     except Exception as e:
@@ -360,7 +794,9 @@ def run_sorting_benchmark(data: List[Dict], n_iterations: int = 10) -> Dict:
     # Benchmark Merge Sort
     print(f"\n🔄 Ejecutando {n_iterations} iteraciones de Merge Sort...")
     for i in range(n_iterations):
-        data_copy = copy.deepcopy(data)
+        # Copia superficial: los algoritmos solo reordenan referencias y no
+        # modifican los diccionarios
+        data_copy = list(data)
         _, metrics = merge_sort(data_copy)
         results['merge_sort']['times'].append(metrics['execution_time_ms'])
         results['merge_sort']['comparisons'].append(metrics['comparisons'])
@@ -369,7 +805,7 @@ def run_sorting_benchmark(data: List[Dict], n_iterations: int = 10) -> Dict:
     # Benchmark Radix Sort
     print(f"\n🔄 Ejecutando {n_iterations} iteraciones de Radix Sort...")
     for i in range(n_iterations):
-        data_copy = copy.deepcopy(data)
+        data_copy = list(data)
         _, metrics = radix_sort(data_copy)
         results['radix_sort']['times'].append(metrics['execution_time_ms'])
         results['radix_sort']['operations'].append(metrics['operations'])
@@ -421,8 +857,8 @@ def verify_sorting_correctness(data: List[Dict], key: str = 'placa') -> bool:
     """
     print("\n🔍 Verificando correctitud de algoritmos...")
     
-    data_copy1 = copy.deepcopy(data)
-    data_copy2 = copy.deepcopy(data)
+    data_copy1 = list(data)
+    data_copy2 = list(data)
     
     result_merge, _ = merge_sort(data_copy1, key)
     result_radix, _ = radix_sort(data_copy2, key)
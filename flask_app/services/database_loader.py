@@ -22,7 +22,7 @@ Autores: Juan David Ruiz Jara, Ian Nolivos, Kléver Castillo,
 
 import pandas as pd
 import os
-from app.io import read_csv
+from app.io import read_csv_typed
 from app.cleaning import validate_schema, convert_types
 
 
@@ -75,8 +75,9 @@ class VehicleDatabase:
             else:
                 raise FileNotFoundError(f"No se encontró el archivo de base de datos: {csv_path}")
 
-        # Cargar CSV usando módulo de I/O existente
-        self.df = read_csv(csv_path)
+        # Cargar CSV usando módulo de I/O existente (los tipos se aplican
+        # durante el parseo; convert_types solo valida y limpia)
+        self.df = read_csv_typed(csv_path)
 
         # Validar esquema
         validate_schema(self.df)
@@ -84,14 +85,39 @@ class VehicleDatabase:
         # Convertir tipos de datos
         self.df = convert_types(self.df)
 
-        # Crear índice por placa para búsqueda rápida O(1)
-        # Nota: set_index optimiza búsquedas con .loc[]
-        self.df.set_index('placa', inplace=True, drop=False)
+        # Registros como lista de diccionarios, materializados una sola vez:
+        # las búsquedas comparativas los reutilizan en cada petición en lugar
+        # de convertir el DataFrame completo (un dict por fila) cada vez
+        self._records = self.df.to_dict('records')
+
+        # Crear índice por placa. La columna pasa al índice (drop=True) en
+        # lugar de quedar duplicada como índice y como columna;
+        # get_all_vehicles la restaura en su posición original
+        self._columns = list(self.df.columns)
+        self.df.set_index('placa', inplace=True)
+
+        # Índice placa -> registro (diccionario de Python) para búsquedas
+        # directas sin pasar por .loc; si una placa aparece varias veces se
+        # conserva su primer registro
+        self._by_plate = {}
+        for record in self._records:
+            self._by_plate.setdefault(record['placa'], record)
+
+        # Lista ordenada de peajes para el filtro del historial
+        self._peajes = sorted(self.df['peaje_ciudad'].dropna().unique().tolist())
+
+        # Estadísticas fijas: los datos no cambian después de la carga
+        self._stats = {
+            'total_vehiculos': len(self.df),
+            'placas_unicas': self.df.index.nunique(),
+            'estados': self.df['estado_ANT'].value_counts().to_dict(),
+            'ubicaciones': self.df['ubicacion_camara'].value_counts().to_dict()
+        }
 
         # Estadísticas de carga
         print(f"\n✅ Base de datos cargada exitosamente:")
         print(f"   📊 Total de registros: {len(self.df):,}")
-        print(f"   🚗 Placas únicas: {self.df['placa'].nunique():,}")
+        print(f"   🚗 Placas únicas: {self.df.index.nunique():,}")
         print(f"   📍 Ubicaciones: {self.df['ubicacion_camara'].nunique()}")
         print(f"   💾 Memoria usada: {self.df.memory_usage(deep=True).sum() / 1024:.2f} KB")
         print("=" * 70 + "\n")
@@ -103,15 +129,16 @@ class VehicleDatabase:
         Returns:
             list: Lista de strings con todas las placas
         """
-        return self.df['placa'].tolist()
+        return self.df.index.tolist()
 
     def get_vehicle_by_plate(self, plate: str) -> dict:
         """
-        Busca vehículo por placa usando índice de Pandas (búsqueda directa O(1)).
+        Busca vehículo por placa usando un índice dict (búsqueda directa O(1)).
 
         NOTA IMPORTANTE:
         Esta búsqueda NO usa los algoritmos Merge/Radix Sort.
-        Es una búsqueda directa usando el índice de Pandas.
+        Es una búsqueda directa en un diccionario construido al cargar la
+        base de datos (más rápida que df.loc, que crea una Serie por consulta).
 
         Los algoritmos Merge/Radix Sort se usan en el módulo search.py
         para comparación académica de rendimiento.
@@ -120,28 +147,58 @@ class VehicleDatabase:
             plate (str): Placa a buscar (ej: "ABC-1234")
 
         Returns:
-            dict: Datos del vehículo, o None si no existe
+            dict: Datos del vehículo (primer registro de la placa), o None si
+            no existe
+        """
+        # Las placas de la base ya están normalizadas (convert_types aplica
+        # strip+upper); solo se normaliza la consulta si no coincide tal cual
+        record = self._by_plate.get(plate)
+        if record is None:
+            record = self._by_plate.get(plate.upper().strip())
+        # Copia superficial para no exponer el registro compartido
+        return dict(record) if record is not None else None
+
+    def get_records(self) -> list:
+        """
+        Retorna los vehículos como lista de diccionarios (uno por fila).
+
+        La lista se construye una vez al cargar la base de datos y se
+        comparte entre llamadas: no debe modificarse.
+
+        Returns:
+            list: Lista de diccionarios con los datos de cada vehículo
         """
-        plate = plate.upper().strip()
+        return self._records
 
-        if plate in self.df.index:
-            return self.df.loc[plate].to_dict()
-        return None
+    def get_peajes(self) -> list:
+        """
+        Retorna la lista ordenada de peajes distintos (calculada al cargar).
+
+        Returns:
+            list: Nombres de los peajes en orden alfabético
+        """
+        return self._peajes
 
     def get_all_vehicles(self) -> pd.DataFrame:
         """
         Retorna DataFrame completo de vehículos.
 
+        Modificarlo no altera los datos originales: con copy-on-write
+        (activado por run_flask.py) comparte las columnas con la base de
+        datos sin copiarlas; sin él, reset_index las copia.
+
         Returns:
-            pd.DataFrame: Copia del DataFrame completo
+            pd.DataFrame: DataFrame completo con índice numérico
         """
-        return self.df.reset_index(drop=True).copy()
+        return self.df.reset_index()[self._columns]
 
     def get_statistics(self) -> dict:
         """
         Retorna estadísticas de la base de datos.
 
-        Útil para el dashboard y API.
+        Útil para el dashboard y API. Se calculan una sola vez al cargar la
+        base de datos; el diccionario retornado es compartido y no debe
+        modificarse.
 
         Returns:
             dict con:
@@ -150,12 +207,7 @@ class VehicleDatabase:
             - estados: distribución de estados ANT
             - ubicaciones: distribución de ubicaciones
         """
-        return {
-            'total_vehiculos': len(self.df),
-            'placas_unicas': self.df['placa'].nunique(),
-            'estados': self.df['estado_ANT'].value_counts().to_dict(),
-            'ubicaciones': self.df['ubicacion_camara'].value_counts().to_dict()
-        }
+        return self._stats
 
 
 # ============================================================================
@@ -5,9 +5,124 @@ Mantiene historial de búsquedas para análisis estadístico.
 
 from flask_app.services.database_loader import get_database
 from app.search import comparative_search
+import atexit
 import json
+import logging
 import os
+import queue
+import threading
+import time
+from collections import Counter, deque
 from datetime import datetime
+from itertools import islice
+
+log = logging.getLogger(__name__)
+
+# orjson (opcional) serializa y parsea las líneas del historial varias veces
+# más rápido que json; sin él se usa la biblioteca estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Historial en formato JSON Lines: una búsqueda por línea, de modo que cada
+# búsqueda nueva se agrega al final sin reescribir el archivo completo
+HISTORY_PATH = 'data/search_history.jsonl'
+# Formato anterior (un único arreglo JSON); se migra al cargar si existe
+LEGACY_HISTORY_PATH = 'data/search_history.json'
+# Máximo de entradas del historial que se conservan en memoria (el archivo
+# guarda todas; los agregados de los reportes también las cubren todas)
+MAX_HISTORY = 10000
+# Máximo de entradas que el escritor en segundo plano agrupa por escritura
+HISTORY_FLUSH_BATCH = 256
+# Intentos por lote si la escritura falla, y espera inicial entre ellos
+# (segundos; se duplica en cada reintento)
+HISTORY_WRITE_RETRIES = 3
+HISTORY_RETRY_DELAY = 0.1
+# Tamaño de bloque (bytes) al leer el final del archivo de historial
+HISTORY_TAIL_BLOCK = 64 * 1024
+
+# Estados ANT que se reportan como alerta
+ALERT_STATES = ('Suspendida', 'Bloqueada')
+
+# Campos numéricos del historial cuyo promedio se reporta en los análisis
+AVERAGED_FIELDS = (
+    'merge_time', 'radix_time',
+    'merge_recursive_calls', 'radix_passes',
+    'merge_comparisons', 'radix_operations',
+    'merge_search_comparisons', 'radix_search_comparisons'
+)
+
+
+def _encode_entry(entry: dict) -> str:
+    """Serializa una entrada del historial como una línea JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(entry).decode('utf-8')
+        except TypeError:
+            # Tipos que orjson no admite: se usa la biblioteca estándar
+            pass
+    return json.dumps(entry)
+
+
+_decode_json = orjson.loads if orjson is not None else json.loads
+
+
+def _empty_aggregates() -> dict:
+    """Crea la estructura vacía de agregados incrementales del historial."""
+    return {
+        'total': 0,
+        'found': 0,
+        'estados': Counter(),
+        'peajes': Counter(),
+        'horas': Counter(),
+        'winners': Counter(),
+        'by_day': Counter(),
+        'top_alertas': Counter(),
+        'alertas_detalle': {},
+        # campo -> [suma, cantidad de valores no nulos]
+        'sumas': {campo: [0.0, 0] for campo in AVERAGED_FIELDS}
+    }
+
+
+def _update_aggregates(agg: dict, entry: dict):
+    """
+    Incorpora una entrada del historial a los agregados (O(1)).
+
+    Raises:
+        KeyError, TypeError, ValueError: Si la entrada no tiene un
+            'timestamp' válido (en ese caso los agregados no cambian)
+    """
+    timestamp = datetime.fromisoformat(entry['timestamp'])
+    agg['total'] += 1
+    agg['horas'][timestamp.hour] += 1
+    agg['by_day'][timestamp.date().isoformat()] += 1
+
+    if entry.get('winner') is not None:
+        agg['winners'][entry['winner']] += 1
+
+    estado = entry.get('estado_ANT')
+    peaje = entry.get('peaje_ciudad')
+    if entry.get('found'):
+        agg['found'] += 1
+        if estado is not None:
+            agg['estados'][estado] += 1
+        if peaje is not None:
+            agg['peajes'][peaje] += 1
+
+    if estado in ALERT_STATES:
+        plate = entry['plate']
+        agg['top_alertas'][plate] += 1
+        # Detalle de la primera alerta registrada para la placa
+        agg['alertas_detalle'].setdefault(plate, (estado, peaje))
+
+    for campo in AVERAGED_FIELDS:
+        valor = entry.get(campo)
+        if valor is not None:
+            suma = agg['sumas'][campo]
+            suma[0] += valor
+            suma[1] += 1
 
 
 class SearchService:
@@ -17,13 +132,33 @@ class SearchService:
     Responsabilidades:
     - Ejecutar búsquedas comparativas
     - Mantener historial de búsquedas
-    - Guardar historial en archivo JSON
+    - Guardar historial en archivo JSON Lines (solo se agregan líneas,
+      desde un hilo en segundo plano que agrupa las escrituras)
+    - Mantener agregados incrementales del historial para los reportes
     """
 
     def __init__(self):
         self.db = get_database()
-        self.history = []
-        self._load_history()
+        # El historial y sus agregados se cargan del archivo en el primer
+        # acceso (propiedades history y agg), no al crear el servicio
+        self._history = None
+        self._agg = None
+        self._load_lock = threading.Lock()
+        # Protege el historial en memoria y los agregados: las peticiones
+        # se atienden en varios hilos y los Counter no admiten ser leídos
+        # mientras otro hilo los modifica
+        self._agg_lock = threading.Lock()
+
+        # Las escrituras del historial a disco se delegan a un hilo: la
+        # petición solo encola la entrada y el hilo escribe por lotes
+        self._write_queue = queue.Queue()
+        # Entradas que no se pudieron escribir desde el último flush()
+        self._lost_entries = 0
+        self._writer = threading.Thread(target=self._flush_worker,
+                                        name='history-writer', daemon=True)
+        self._writer.start()
+        # Escribir lo pendiente antes de que termine el intérprete
+        atexit.register(self.flush)
 
     def search_plate(self, plate: str) -> dict:
         """
@@ -35,8 +170,9 @@ class SearchService:
         Returns:
             Dict con resultados de búsqueda y comparativa de algoritmos
         """
-        # Obtener lista de vehículos como diccionarios
-        vehicles = self.db.get_all_vehicles().to_dict('records')
+        # Lista de vehículos como diccionarios (cacheada por la base de datos;
+        # comparative_search no modifica la lista ni sus elementos)
+        vehicles = self.db.get_records()
 
         # Realizar búsqueda comparativa usando ambos algoritmos
         result = comparative_search(vehicles, plate)
@@ -46,14 +182,117 @@ class SearchService:
 
         return result
 
+    @property
+    def history(self) -> deque:
+        """Últimas MAX_HISTORY búsquedas en memoria (carga en el primer acceso)."""
+        if self._history is None:
+            self._load_history()
+        return self._history
+
+    @property
+    def agg(self) -> dict:
+        """
+        Agregados incrementales de todo el historial (carga en el primer acceso).
+
+        Se calculan una vez al cargar y luego se actualizan con cada
+        búsqueda, así el endpoint de análisis no recorre el historial
+        completo en cada petición.
+        """
+        if self._agg is None:
+            self._load_history()
+        return self._agg
+
     def _load_history(self):
-        """Carga historial desde archivo JSON si existe."""
-        try:
-            if os.path.exists('data/search_history.json'):
-                with open('data/search_history.json', 'r') as f:
-                    self.history = json.load(f)
-        except:
-            self.history = []
+        """Carga historial desde archivo JSON Lines si existe."""
+        with self._load_lock:
+            if self._history is not None:
+                return
+            # Solo las últimas MAX_HISTORY entradas quedan en memoria
+            history = deque(maxlen=MAX_HISTORY)
+            agg = _empty_aggregates()
+            try:
+                if os.path.exists(HISTORY_PATH):
+                    # Leer línea por línea, sin materializar el archivo
+                    # completo; una línea inválida (ej. la última, cortada por
+                    # una caída durante la escritura) se omite sin descartar
+                    # el resto del historial
+                    with open(HISTORY_PATH, 'r', encoding='utf-8') as f:
+                        for numero, line in enumerate(f, 1):
+                            if not line.strip():
+                                continue
+                            try:
+                                entry = _decode_json(line)
+                                _update_aggregates(agg, entry)
+                            except (ValueError, KeyError, TypeError):
+                                log.warning("Línea %d inválida en %s, se omite",
+                                            numero, HISTORY_PATH)
+                                continue
+                            history.append(entry)
+                elif os.path.exists(LEGACY_HISTORY_PATH):
+                    # Migrar el historial en formato arreglo JSON una sola vez
+                    with open(LEGACY_HISTORY_PATH, 'r', encoding='utf-8') as f:
+                        entries = _decode_json(f.read())
+                    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+                    with open(HISTORY_PATH, 'w', encoding='utf-8') as f:
+                        f.writelines(_encode_entry(entry) + '\n' for entry in entries)
+                    for entry in entries:
+                        try:
+                            _update_aggregates(agg, entry)
+                        except (ValueError, KeyError, TypeError):
+                            log.warning("Entrada inválida en %s, se omite",
+                                        LEGACY_HISTORY_PATH)
+                            continue
+                        history.append(entry)
+            except (OSError, ValueError):
+                # Se conserva lo que se alcanzó a leer
+                log.exception("No se pudo leer el historial de búsquedas")
+            self._agg = agg
+            self._history = history
+
+    def _read_history_tail(self, limit: int) -> list:
+        """
+        Lee las últimas `limit` entradas directamente del final del archivo.
+
+        Se usa mientras el historial no está cargado en memoria: retrocede
+        por bloques desde el final hasta reunir `limit` líneas completas
+        y solo decodifica esas.
+        """
+        if limit == 0:
+            return []
+        with open(HISTORY_PATH, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b''
+            while pos > 0 and data.count(b'\n') <= limit:
+                step = min(HISTORY_TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if pos > 0:
+            # La primera línea del bloque puede estar incompleta
+            lines = lines[1:]
+        lines = [line for line in lines if line.strip()]
+        return [_decode_json(line) for line in lines[-limit:]]
+
+    def get_aggregates(self) -> dict:
+        """
+        Copia de los agregados incrementales, tomada bajo el mismo candado
+        que las actualizaciones (el endpoint de análisis la recorre sin
+        bloquear las búsquedas).
+        """
+        agg = self.agg
+        with self._agg_lock:
+            snapshot = {campo: valor.copy() if isinstance(valor, dict) else valor
+                        for campo, valor in agg.items()}
+            snapshot['sumas'] = {campo: list(suma) for campo, suma in agg['sumas'].items()}
+        return snapshot
+
+    def _add_entry(self, entry: dict):
+        """Agrega una entrada al historial en memoria y a los agregados."""
+        history, agg = self.history, self.agg
+        with self._agg_lock:
+            _update_aggregates(agg, entry)
+            history.append(entry)
 
     def _save_to_history(self, result: dict):
         """Guarda búsqueda en historial."""
@@ -79,19 +318,99 @@ class SearchService:
             'estado_ANT': result['vehicle']['estado_ANT'] if result['found'] and result['vehicle'] else None,
             'ubicacion_camara': result['vehicle']['ubicacion_camara'] if result['found'] and result['vehicle'] else None
         }
-        self.history.append(entry)
+        self._add_entry(entry)
 
-        # Guardar en archivo JSON
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open('data/search_history.json', 'w') as f:
-                json.dump(self.history, f, indent=2)
-        except:
-            pass
+        # La escritura a disco la hace el hilo escritor
+        self._write_queue.put(entry)
+
+    def _flush_worker(self):
+        """
+        Hilo escritor: agrega al archivo las entradas encoladas, por lotes.
+
+        Cada lote se escribe con una sola apertura del archivo y una
+        escritura (O(1) por búsqueda, sin volver a serializar todo el
+        historial). Si la escritura falla se reintenta; las entradas que no
+        se logran escribir se registran en el log y se reportan en flush().
+        """
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < HISTORY_FLUSH_BATCH:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = []
+                for entry in batch:
+                    try:
+                        lines.append(_encode_entry(entry) + '\n')
+                    except (TypeError, ValueError):
+                        log.exception("Entrada del historial no serializable, se omite")
+                        self._lost_entries += 1
+                if lines:
+                    try:
+                        self._append_lines(''.join(lines))
+                    except OSError:
+                        log.exception("No se pudieron escribir %d entradas del historial en %s",
+                                      len(lines), HISTORY_PATH)
+                        self._lost_entries += len(lines)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def _append_lines(self, data: str):
+        """
+        Agrega `data` al archivo de historial, con reintentos.
+
+        Raises:
+            OSError: Si la escritura falla en todos los intentos
+        """
+        for intento in range(1, HISTORY_WRITE_RETRIES + 1):
+            try:
+                os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+                with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+                    f.write(data)
+                return
+            except OSError:
+                if intento == HISTORY_WRITE_RETRIES:
+                    raise
+                log.warning("Fallo al escribir el historial (intento %d de %d), reintentando",
+                            intento, HISTORY_WRITE_RETRIES)
+                time.sleep(HISTORY_RETRY_DELAY * 2 ** (intento - 1))
+                # Un intento fallido pudo dejar una línea cortada: empezar en
+                # una línea nueva (las líneas vacías se ignoran al cargar)
+                if not data.startswith('\n'):
+                    data = '\n' + data
+
+    def flush(self):
+        """
+        Espera a que todas las entradas encoladas se escriban en disco.
+
+        Raises:
+            OSError: Si desde el último flush() alguna entrada no se pudo
+                escribir (el detalle queda en el log)
+        """
+        self._write_queue.join()
+        perdidas, self._lost_entries = self._lost_entries, 0
+        if perdidas:
+            raise OSError(f"No se pudieron escribir {perdidas} entradas del "
+                          f"historial en {HISTORY_PATH}")
 
     def get_history(self, limit=50):
-        """Retorna historial de búsquedas."""
-        return self.history[-limit:]
+        """Retorna las últimas `limit` búsquedas, en orden cronológico."""
+        limit = min(max(limit, 0), MAX_HISTORY)
+        if self._history is None and os.path.exists(HISTORY_PATH):
+            # Sin cargar el historial completo: leer solo el final del archivo
+            try:
+                return self._read_history_tail(limit)
+            except (OSError, ValueError):
+                log.warning("No se pudo leer el final de %s, se carga el historial completo",
+                            HISTORY_PATH)
+        history = self.history
+        with self._agg_lock:
+            ultimas = list(islice(reversed(history), limit))
+        ultimas.reverse()
+        return ultimas
 
 
 # Instancia global (Singleton)
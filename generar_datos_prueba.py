@@ -4,83 +4,77 @@ Genera aproximadamente 100 búsquedas simuladas con variedad de casos.
 """
 
 import json
-import random
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
 # Cargar base de datos de vehículos
 df = pd.read_csv('data/placas_database.csv')
 
-# Preparar lista de historial
-historial = []
-
-# Generar 100 búsquedas simuladas
+# Generar 100 búsquedas simuladas, todas de una vez con NumPy (sin un
+# bucle de Python por búsqueda)
 num_busquedas = 100
 fecha_inicio = datetime.now() - timedelta(days=7)  # Últimos 7 días
 
-for i in range(num_busquedas):
-    # Timestamp aleatorio en los últimos 7 días
-    offset_minutos = random.randint(0, 7 * 24 * 60)
-    timestamp = fecha_inicio + timedelta(minutes=offset_minutos)
-
-    # Seleccionar vehículo aleatorio (90% encontrado, 10% no encontrado)
-    encontrado = random.random() < 0.9
-
-    if encontrado:
-        vehiculo = df.sample(1).iloc[0]
-        placa = vehiculo['placa']
-        peaje_ciudad = vehiculo['peaje_ciudad']
-        estado_ant = vehiculo['estado_ANT']
-        ubicacion_camara = vehiculo['ubicacion_camara']
-    else:
-        # Placa no encontrada (inventada)
-        letras = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
-        numeros = ''.join(random.choices('0123456789', k=4))
-        placa = f"{letras}-{numeros}"
-        peaje_ciudad = None
-        estado_ant = None
-        ubicacion_camara = None
-
-    # Simular tiempos de ejecución basados en resultados REALES
-    # Según pruebas: Merge Sort ~10ms, Radix Sort ~16ms
-    # Merge Sort es MÁS RÁPIDO que Radix Sort (aproximadamente 40% más rápido)
-
-    # Merge Sort: 8-12ms (promedio ~10ms)
-    merge_time = round(random.uniform(8.0, 12.0), 4)
-
-    # Radix Sort: 14-19ms (promedio ~16.5ms, siempre más lento que Merge)
-    # Aseguramos que sea al menos 30% más lento que Merge Sort
-    radix_time = round(merge_time * random.uniform(1.4, 1.8), 4)
-
-    # Merge Sort SIEMPRE gana (es más rápido)
-    winner = "Merge Sort"
-
-    # Crear entrada de historial
-    entrada = {
-        'timestamp': timestamp.isoformat(),
-        'plate': placa,
-        'found': encontrado,
-        'winner': winner,
-        'merge_time': merge_time,
-        'radix_time': radix_time,
-        'peaje_ciudad': peaje_ciudad,
-        'estado_ANT': estado_ant,
-        'ubicacion_camara': ubicacion_camara
-    }
-
-    historial.append(entrada)
+# Timestamp aleatorio en los últimos 7 días
+offset_minutos = np.random.randint(0, 7 * 24 * 60 + 1, size=num_busquedas)
+timestamps = pd.Timestamp(fecha_inicio) + pd.to_timedelta(offset_minutos, unit='m')
+
+# Seleccionar vehículo aleatorio (90% encontrado, 10% no encontrado)
+encontrado = np.random.random(num_busquedas) < 0.9
+n_encontrados = int(encontrado.sum())
+vehiculos = df.sample(n=n_encontrados, replace=True)
+
+# Placas no encontradas (inventadas): 3 letras y 4 dígitos
+n_inventadas = num_busquedas - n_encontrados
+letras = np.random.randint(65, 91, size=(n_inventadas, 3), dtype=np.uint8)
+numeros = np.random.randint(48, 58, size=(n_inventadas, 4), dtype=np.uint8)
+guiones = np.full((n_inventadas, 1), ord('-'), dtype=np.uint8)
+placas_inventadas = [fila.tobytes().decode('ascii')
+                     for fila in np.hstack([letras, guiones, numeros])]
+
+# Simular tiempos de ejecución basados en resultados REALES
+# Según pruebas: Merge Sort ~10ms, Radix Sort ~16ms
+# Merge Sort es MÁS RÁPIDO que Radix Sort (aproximadamente 40% más rápido)
+
+# Merge Sort: 8-12ms (promedio ~10ms)
+merge_time = np.round(np.random.uniform(8.0, 12.0, size=num_busquedas), 4)
+
+# Radix Sort: 14-19ms (promedio ~16.5ms, siempre más lento que Merge)
+# Aseguramos que sea al menos 30% más lento que Merge Sort
+radix_time = np.round(merge_time * np.random.uniform(1.4, 1.8, size=num_busquedas), 4)
+
+# Crear entradas de historial (Merge Sort SIEMPRE gana: es más rápido)
+historial = pd.DataFrame({
+    'timestamp': timestamps.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+    'plate': None,
+    'found': encontrado,
+    'winner': "Merge Sort",
+    'merge_time': merge_time,
+    'radix_time': radix_time,
+    'peaje_ciudad': None,
+    'estado_ANT': None,
+    'ubicacion_camara': None
+})
+columnas_vehiculo = ['peaje_ciudad', 'estado_ANT', 'ubicacion_camara']
+historial.loc[encontrado, 'plate'] = vehiculos['placa'].to_numpy()
+historial.loc[encontrado, columnas_vehiculo] = vehiculos[columnas_vehiculo].to_numpy()
+historial.loc[~encontrado, 'plate'] = placas_inventadas
 
 # Ordenar por timestamp
-historial.sort(key=lambda x: x['timestamp'])
+historial = historial.sort_values('timestamp', kind='stable')
 
-# Guardar en archivo JSON
-with open('data/search_history.json', 'w', encoding='utf-8') as f:
-    json.dump(historial, f, indent=2, ensure_ascii=False)
+# Guardar en archivo JSON Lines (una búsqueda por línea, mismo formato que
+# usa el servicio de búsqueda)
+historial = historial.to_dict('records')
+with open('data/search_history.jsonl', 'w', encoding='utf-8') as f:
+    for entrada in historial:
+        f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
 
 print(f"Generados {len(historial)} registros de busqueda")
 print(f"Encontrados: {sum(1 for h in historial if h['found'])}")
 print(f"No encontrados: {sum(1 for h in historial if not h['found'])}")
-print(f"Guardado en: data/search_history.json")
+print(f"Guardado en: data/search_history.jsonl")
 
 # Estadísticas adicionales
 estados = [h['estado_ANT'] for h in historial if h['estado_ANT']]
@@ -4,8 +4,11 @@ Ejecutar con: python run_flask.py
 """
 
 import os
+import random
 import sys
 
+import pandas as pd
+
 # Agregar directorio del proyecto al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -13,8 +16,11 @@ from flask import Flask, render_template, request, jsonify
 from flask_app.config import config_by_name
 from flask_app.services.database_loader import get_database
 from flask_app.services.search_service import get_search_service
-import re
+from app.cleaning import PLATE_RE
 
+# Activar copy-on-write en la aplicación: los DataFrames derivados (assign,
+# selecciones) comparten las columnas no modificadas en lugar de copiarlas
+pd.options.mode.copy_on_write = True
 
 # Crear aplicación Flask
 app = Flask(__name__,
@@ -27,7 +33,10 @@ app.config.from_object(config_by_name[env])
 
 # Cargar base de datos al iniciar
 with app.app_context():
-    get_database()
+    # Los datos no cambian después de la carga: la respuesta de
+    # /api/database/stats se serializa una sola vez
+    _STATS_JSON = app.json.dumps({'success': True,
+                                  'data': get_database().get_statistics()})
 
 
 # ============================================================================
@@ -53,9 +62,8 @@ def historial():
     Muestra lista ordenada por algoritmo más rápido con filtro por peaje.
     """
     db = get_database()
-    # Obtener lista única de peajes para el filtro
-    peajes = db.get_all_vehicles()['peaje_ciudad'].unique().tolist()
-    peajes.sort()
+    # Lista única de peajes para el filtro (precalculada al cargar la base)
+    peajes = db.get_peajes()
     return render_template('pages/historial.html', peajes=peajes)
 
 
@@ -86,7 +94,7 @@ def buscar_placa():
         return jsonify({'success': False, 'error': 'Debe ingresar una placa'}), 400
 
     # Validar formato (ABC-1234)
-    if not re.match(r'^[A-Z]{3}-\d{4}$', plate):
+    if not PLATE_RE.fullmatch(plate):
         return jsonify({'success': False, 'error': 'Formato de placa inválido. Use: ABC-1234'}), 400
 
     # Ejecutar búsqueda
@@ -128,18 +136,15 @@ def buscar_placa():
 
 @app.route('/api/database/stats')
 def get_database_stats():
-    """Retorna estadísticas de la base de datos."""
-    db = get_database()
-    stats = db.get_statistics()
-    return jsonify({'success': True, 'data': stats})
+    """Retorna estadísticas de la base de datos (respuesta precalculada)."""
+    return app.response_class(_STATS_JSON + '\n', mimetype=app.json.mimetype)
 
 
 @app.route('/api/vehicles/random')
 def get_random_vehicle():
     """Retorna un vehículo aleatorio (para testing)."""
     db = get_database()
-    df = db.get_all_vehicles()
-    random_vehicle = df.sample(1).to_dict('records')[0]
+    random_vehicle = random.choice(db.get_records())
     return jsonify({'success': True, 'data': random_vehicle})
 
 
@@ -149,8 +154,8 @@ def get_random_sample():
     n = request.args.get('n', 15, type=int)
     n = min(max(n, 5), 30)
     db = get_database()
-    df = db.get_all_vehicles()
-    sample = df.sample(min(n, len(df))).to_dict('records')
+    vehicles = db.get_records()
+    sample = random.sample(vehicles, min(n, len(vehicles)))
     return jsonify({
         'success': True,
         'data': [{'placa': v['placa']} for v in sample]
@@ -179,80 +184,69 @@ def get_analisis_datos():
     Endpoint para análisis exploratorio de datos del historial.
     Retorna estadísticas agregadas y datos para visualizaciones.
     """
-    import pandas as pd
-    from collections import Counter
-
     search_service = get_search_service()
-    history = search_service.get_history(10000)  # Obtener todo el historial
+    # Copia de los agregados incrementales de todo el historial
+    agg = search_service.get_aggregates()
 
-    if not history:
+    if not agg['total']:
         return jsonify({'success': False, 'error': 'No hay datos en el historial'})
 
-    # Convertir a DataFrame para análisis
-    df = pd.DataFrame(history)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-    # Extraer componentes de tiempo
-    df['hora'] = df['timestamp'].dt.hour
-    df['dia_semana'] = df['timestamp'].dt.day_name()
-    df['fecha'] = df['timestamp'].dt.date.astype(str)
+    def promedio(campo, decimales=2):
+        suma, cantidad = agg['sumas'][campo]
+        return round(suma / cantidad, decimales) if cantidad else 0
 
     # --- ANÁLISIS 1: Top 10 Placas con más Alertas (Suspendida/Bloqueada) ---
-    df_alertas = df[df['estado_ANT'].isin(['Suspendida', 'Bloqueada'])]
-    top_alertas = df_alertas['plate'].value_counts().head(10).to_dict()
-
-    # Obtener detalles de las placas con alertas
     top_alertas_detalle = []
-    for placa, count in list(top_alertas.items())[:10]:
-        registros = df_alertas[df_alertas['plate'] == placa]
+    for placa, count in agg['top_alertas'].most_common(10):
+        estado, peaje = agg['alertas_detalle'][placa]
         top_alertas_detalle.append({
             'placa': placa,
-            'total_alertas': int(count),
-            'estado': registros.iloc[0]['estado_ANT'],
-            'peaje': registros.iloc[0]['peaje_ciudad']
+            'total_alertas': count,
+            'estado': estado,
+            'peaje': peaje
         })
 
     # --- ANÁLISIS 2: Distribución por Estado ANT ---
-    estados_dist = df[df['found'] == True]['estado_ANT'].value_counts().to_dict()
+    estados_dist = dict(agg['estados'].most_common())
 
     # --- ANÁLISIS 3: Distribución por Hora del Día ---
-    horas_dist = df['hora'].value_counts().sort_index().to_dict()
+    horas_dist = dict(sorted(agg['horas'].items()))
 
     # --- ANÁLISIS 4: Distribución por Peaje ---
-    peajes_dist = df[df['found'] == True]['peaje_ciudad'].value_counts().to_dict()
+    peajes_dist = dict(agg['peajes'].most_common())
 
     # --- ANÁLISIS 5: Algoritmo Ganador ---
-    winner_dist = df['winner'].value_counts().to_dict()
+    winner_dist = dict(agg['winners'].most_common())
 
     # --- ANÁLISIS 6: Tasa de Éxito de Búsqueda ---
-    tasa_exito = (df['found'].sum() / len(df)) * 100
+    tasa_exito = (agg['found'] / agg['total']) * 100
 
     # --- ANÁLISIS 7: Tiempos Promedio ---
-    tiempo_merge_promedio = df['merge_time'].mean()
-    tiempo_radix_promedio = df['radix_time'].mean()
+    tiempo_merge_promedio = promedio('merge_time', 4)
+    tiempo_radix_promedio = promedio('radix_time', 4)
 
     # --- ANÁLISIS 8: Búsquedas por Día ---
-    busquedas_por_dia = df['fecha'].value_counts().sort_index().to_dict()
+    busquedas_por_dia = dict(sorted(agg['by_day'].items()))
 
     # --- ANÁLISIS 9: Top 10 Peajes con Más Capturas ---
-    top_peajes = df[df['found'] == True]['peaje_ciudad'].value_counts().head(10).to_dict()
+    top_peajes = dict(agg['peajes'].most_common(10))
 
     # --- ANÁLISIS 10: Promedio de Iteraciones (recursive_calls / passes) ---
-    avg_merge_iterations = round(df['merge_recursive_calls'].mean(), 2) if 'merge_recursive_calls' in df.columns else 0
-    avg_radix_iterations = round(df['radix_passes'].mean(), 2) if 'radix_passes' in df.columns else 0
+    avg_merge_iterations = promedio('merge_recursive_calls')
+    avg_radix_iterations = promedio('radix_passes')
 
     # --- ANÁLISIS 11: Promedio de Comparaciones / Operaciones ---
-    avg_merge_comparisons = round(df['merge_comparisons'].mean(), 2) if 'merge_comparisons' in df.columns else 0
-    avg_radix_operations = round(df['radix_operations'].mean(), 2) if 'radix_operations' in df.columns else 0
+    avg_merge_comparisons = promedio('merge_comparisons')
+    avg_radix_operations = promedio('radix_operations')
 
     # --- ANÁLISIS 12: Promedio de comparaciones de búsqueda binaria ---
-    avg_merge_search_comp = round(df['merge_search_comparisons'].mean(), 2) if 'merge_search_comparisons' in df.columns else 0
-    avg_radix_search_comp = round(df['radix_search_comparisons'].mean(), 2) if 'radix_search_comparisons' in df.columns else 0
+    avg_merge_search_comp = promedio('merge_search_comparisons')
+    avg_radix_search_comp = promedio('radix_search_comparisons')
 
     # Respuesta
     analisis = {
         'success': True,
-        'total_busquedas': len(df),
+        'total_busquedas': agg['total'],
         'tasa_exito': round(tasa_exito, 2),
         'top_alertas': top_alertas_detalle,
         'distribucion_estados': estados_dist,
@@ -260,8 +254,8 @@ def get_analisis_datos():
         'distribucion_peajes': peajes_dist,
         'algoritmo_ganador': winner_dist,
         'tiempos_promedio': {
-            'merge_sort': round(tiempo_merge_promedio, 4),
-            'radix_sort': round(tiempo_radix_promedio, 4)
+            'merge_sort': tiempo_merge_promedio,
+            'radix_sort': tiempo_radix_promedio
         },
         'busquedas_por_dia': busquedas_por_dia,
         'top_peajes': top_peajes,